@@ -0,0 +1,300 @@
+"""
+性能基准测试.
+
+Usages:
+    python benchmarks/bench.py                        # 运行全部基准，输出 JSON 到 bench.json
+    python benchmarks/bench.py --quick                # 缩小规模
+    python benchmarks/bench.py -k radar               # 只运行名称包含 radar 的基准
+    python benchmarks/bench.py --save-baseline        # 将结果保存为基线 benchmarks/baseline.json
+    python benchmarks/bench.py --baseline benchmarks/baseline.json --tolerance 0.2
+
+与基线比较时，吞吐率下降超过 tolerance 的基准标记为回退，进程返回码为 1.
+仓库中的基线由 --quick 生成；基线与运行机器相关，更换机器后应重新保存.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from sim import Environment  # noqa: E402
+from sim.common import Uav, Radar, Jammer, UavFleet  # noqa: E402
+from sim.move import MoveEntity, MovePolicy, xyz_to_aer, xyz_to_aer_batch  # noqa: E402
+from sim.recorder import PropRecorder  # noqa: E402
+from sim.vec import vec, dist, unit  # noqa: E402
+from sim.interact import PairwiseForce, gravity  # noqa: E402
+from sim.ensemble import Ensemble  # noqa: E402
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def timeit(fun, repeat=3):
+    """ 多次运行取最短耗时 (s). """
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fun()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+##############################################################################
+# 基准场景.
+##############################################################################
+
+
+def bench_env_step(n, steps=10):
+    """ N 个 MoveEntity 的环境步进. 单位: 实体步/秒. """
+    rng = np.random.default_rng(0)
+    env = Environment()
+    env.add_many(MoveEntity(pos=p, vel=v) for p, v in zip(rng.uniform(-1e3, 1e3, (n, 3)), rng.normal(size=(n, 3))))
+    env.set_params(stop=1e9)
+    env.reset()
+
+    def run():
+        for _ in range(steps):
+            env.step()
+
+    return n * steps / timeit(run)
+
+
+def bench_radar(n_radar, n_uav, steps=5):
+    """ 雷达扫描密集无人机群. 单位: 雷达-目标对/秒. """
+    rng = np.random.default_rng(0)
+    env = Environment()
+    for p in rng.uniform(-1e3, 1e3, (n_uav, 3)):
+        env.add(Uav(track=[p, p + [100, 0, 0]], speed=5.0))
+    for p in rng.uniform(-1e3, 1e3, (n_radar, 3)):
+        env.add(Radar(pos=p, out='aer', rate=1.0, r_range=[None, 5e3]))
+    env.set_params(stop=1e9)
+    env.reset()
+
+    def run():
+        for _ in range(steps):
+            env.step()
+
+    return n_radar * n_uav * steps / timeit(run)
+
+
+def bench_uavs(n, fleet, steps=10):
+    """ 无人机群飞行（逐架 Uav 或 UavFleet）. 单位: 无人机步/秒. """
+    rng = np.random.default_rng(0)
+    tracks = [rng.uniform(-1e3, 1e3, (20, 3)) for _ in range(n)]
+    env = Environment()
+    if fleet:
+        env.add(UavFleet(tracks, speed=20.0, life=1e9))
+    else:
+        env.add_many(Uav(track=t, speed=20.0, life=1e9) for t in tracks)
+    env.set_params(stop=1e9)
+    env.reset()
+
+    def run():
+        for _ in range(steps):
+            env.step()
+
+    return n * steps / timeit(run)
+
+
+G = 1.0e3
+
+
+class GravityPolicy(MovePolicy):
+    """ 引力策略（同 examples/multi_body.py）. """
+
+    def access(self, others):
+        f0 = vec([0, 0])
+        _, dt = self.parent.env.time_info
+        for obj in others:
+            r = dist(self.parent.pos, obj.pos)
+            f = unit(obj.pos - self.parent.pos) * G * obj.m / (r ** 2)
+            f0 = f0 + f
+        self.parent.vel += f0 * dt
+
+
+def bench_multi_body(n, engine=False, steps=5):
+    """ 多体引力场景（逐对策略或 PairwiseForce）. 单位: 实体对/秒. """
+    rng = np.random.default_rng(0)
+    env = Environment()
+    for p in rng.uniform(-1e3, 1e3, (n, 2)):
+        kwargs = {} if engine else {'policy': GravityPolicy()}
+        env.add(MoveEntity(props={'m': 1.0}, pos=p, vel=[0, 0], **kwargs))
+    if engine:
+        env.add(PairwiseForce(gravity(G)))
+    env.set_params(stop=1e9)
+    env.reset()
+
+    def run():
+        for _ in range(steps):
+            env.step()
+
+    return n * (n - 1) * steps / timeit(run)
+
+
+def _build_bodies(seed, n=5):
+    rng = np.random.default_rng(seed)
+    env = Environment()
+    for p in rng.uniform(-1e3, 1e3, (n, 2)):
+        env.add(MoveEntity(props={'m': 1.0}, pos=p, vel=[0, 0]))
+    env.add(PairwiseForce(gravity(G)))
+    return env
+
+
+def _build_uavs(seed, n=5):
+    rng = np.random.default_rng(seed)
+    env = Environment()
+    for _ in range(n):
+        env.add(Uav(track=rng.uniform(-100, 100, (4, 2)).tolist(), speed=3.0))
+    env.add(Jammer(pos=[0, 0], range=40.0, power_on=True))
+    return env
+
+
+def bench_ensemble(k, ensemble, factory=_build_bodies, steps=20):
+    """ K 个小型副本（集合运行或逐个副本运行）. 单位: 副本步/秒. """
+    if ensemble:
+        ens = Ensemble(factory, range(k))
+        ens.set_params(stop=1e9)
+        ens.reset()
+        targets = [ens]
+    else:
+        targets = [factory(seed) for seed in range(k)]
+        for env in targets:
+            env.set_params(stop=1e9)
+            env.reset()
+
+    def run():
+        for _ in range(steps):
+            for target in targets:
+                target.step()
+
+    return k * steps / timeit(run)
+
+
+def bench_recorder(n, columnar, steps=20):
+    """ 记录器开销. 单位: 记录/秒. """
+    env = Environment()
+    env.add_many(MoveEntity(pos=[0, 0, 0], vel=[1, 1, 1]) for _ in range(n))
+    env.set_params(stop=1e9)
+    env.reset()
+
+    def run():
+        recorder = PropRecorder('pos', columnar=columnar)
+        for _ in range(steps):
+            recorder(env)
+
+    return n * steps / timeit(run)
+
+
+def bench_xyz_to_aer(n, batch):
+    """ XYZ 转 AER. 单位: 点/秒. """
+    pts = np.random.default_rng(0).uniform(-1e3, 1e3, (n, 3))
+    origin = vec([1, 2, 3])
+    if batch:
+        return n / timeit(lambda: xyz_to_aer_batch(pts, origin))
+    return n / timeit(lambda: [xyz_to_aer(p, origin) for p in pts])
+
+
+def cases(quick=False):
+    """ 基准列表 [(名称, 函数)]. """
+    ret = []
+    for n in ([10, 100, 1000] if quick else [10, 100, 1000, 10000, 100000]):
+        ret.append((f'env_step/n={n}', lambda n=n: bench_env_step(n)))
+    for r, u in ([(2, 200)] if quick else [(2, 200), (20, 2000)]):
+        ret.append((f'radar/radars={r},uavs={u}', lambda r=r, u=u: bench_radar(r, u)))
+    for n in ([2, 20] if quick else [2, 20, 100]):
+        ret.append((f'multi_body/n={n}', lambda n=n: bench_multi_body(n)))
+        ret.append((f'multi_body/engine/n={n}', lambda n=n: bench_multi_body(n, engine=True)))
+    for n in ([100] if quick else [100, 1000]):
+        ret.append((f'uav/objects/n={n}', lambda n=n: bench_uavs(n, False)))
+        ret.append((f'uav/fleet/n={n}', lambda n=n: bench_uavs(n, True)))
+    for k in ([10, 100] if quick else [10, 100, 1000]):
+        ret.append((f'ensemble/serial/k={k}', lambda k=k: bench_ensemble(k, False)))
+        ret.append((f'ensemble/batched/k={k}', lambda k=k: bench_ensemble(k, True)))
+        ret.append((f'ensemble/uav/serial/k={k}', lambda k=k: bench_ensemble(k, False, _build_uavs)))
+        ret.append((f'ensemble/uav/batched/k={k}', lambda k=k: bench_ensemble(k, True, _build_uavs)))
+    for n in ([100] if quick else [100, 10000]):
+        ret.append((f'recorder/list/n={n}', lambda n=n: bench_recorder(n, False)))
+        ret.append((f'recorder/columnar/n={n}', lambda n=n: bench_recorder(n, True)))
+    n = 10000 if quick else 1000000
+    ret.append((f'xyz_to_aer/scalar/n={n // 100}', lambda: bench_xyz_to_aer(n // 100, False)))
+    ret.append((f'xyz_to_aer/batch/n={n}', lambda: bench_xyz_to_aer(n, True)))
+    return ret
+
+
+##############################################################################
+# 运行与比较.
+##############################################################################
+
+
+def run(quick=False, keyword=None, show=True) -> dict:
+    """ 运行基准，返回 {名称: 吞吐率}. """
+    results = {}
+    for name, fun in cases(quick):
+        if keyword and keyword not in name:
+            continue
+        results[name] = fun()
+        if show:
+            print(f'{name:40s} {results[name]:14.1f} /s')
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance=0.2) -> list:
+    """ 与基线比较，返回回退列表 [(名称, 当前, 基线, 比例)]. """
+    regressions = []
+    for name, value in results.items():
+        base = baseline.get(name)
+        if base and value < base * (1.0 - tolerance):
+            regressions.append((name, value, base, value / base))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='sim benchmarks')
+    parser.add_argument('--quick', action='store_true', help='缩小规模')
+    parser.add_argument('-k', dest='keyword', default=None, help='只运行名称包含该字符串的基准')
+    parser.add_argument('-o', '--output', default='bench.json', help='结果 JSON 文件')
+    parser.add_argument('--baseline', default=None, help=f'基线 JSON 文件. 默认为 {os.path.relpath(BASELINE)}')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='允许的吞吐率下降比例')
+    parser.add_argument('--save-baseline', action='store_true', help='将结果保存为基线')
+    args = parser.parse_args(argv)
+
+    results = run(args.quick, args.keyword)
+    report = {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    path = args.baseline or BASELINE
+    if args.save_baseline:
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        return 0
+
+    if not os.path.exists(path):
+        # 显式指定的基线不存在视为错误；默认基线不存在时给出警告.
+        print(f'{"ERROR" if args.baseline else "WARNING"}: baseline {path} not found, regression check skipped',
+              file=sys.stderr)
+        return 2 if args.baseline else 0
+    with open(path) as f:
+        baseline = json.load(f)['results']
+    missing = [name for name in results if name not in baseline]
+    if missing:
+        print(f'WARNING: no baseline for {", ".join(missing)}', file=sys.stderr)
+    regressions = compare(results, baseline, args.tolerance)
+    for name, value, base, ratio in regressions:
+        print(f'REGRESSION {name}: {value:.1f} /s vs baseline {base:.1f} /s ({ratio:.0%})')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""
+命令行批量运行场景文件（无界面）.
+
+Usages:
+    python -m sim scenario.yaml -o results
+    python -m sim a.json b.yaml -o results --stop 100 --seed 1
+"""
+
+import argparse
+import json
+import os
+import sys
+from .scenario import Scenario, load_spec, needs_output
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m sim', description='无界面运行场景文件')
+    parser.add_argument('scenarios', nargs='+', help='场景文件 (.json/.yaml)')
+    parser.add_argument('-o', '--out', default=None, help='输出目录. 多个场景时按文件名分子目录')
+    parser.add_argument('--stop', type=float, default=None, help='覆盖结束时间')
+    parser.add_argument('--step', type=float, default=None, help='覆盖步长')
+    parser.add_argument('--seed', type=int, default=None, help='覆盖随机数种子')
+    parser.add_argument('-q', '--quiet', action='store_true', help='不输出统计')
+    args = parser.parse_args(argv)
+
+    overrides = {k: v for k, v in (('stop', args.stop), ('step', args.step), ('seed', args.seed)) if v is not None}
+    for path in args.scenarios:
+        out = args.out
+        if out is not None and len(args.scenarios) > 1:
+            out = os.path.join(out, os.path.splitext(os.path.basename(path))[0])
+        try:
+            spec = load_spec(path)
+            if out is None and needs_output(spec):
+                parser.error(f'{path}: stream recording requires an output directory; pass -o OUT')
+            scenario = Scenario(spec, out=out)
+        except (OSError, ValueError) as e:
+            parser.error(f'{path}: {e}')
+        stats = scenario.run(**overrides)
+        if out is not None:
+            scenario.save(out)
+            with open(os.path.join(out, 'summary.json'), 'w', encoding='utf-8') as f:
+                json.dump(dict(stats, scenario=path), f, indent=2)
+        if not args.quiet:
+            print(f'{path}: {stats["entities"]} entities, {stats["steps"]} steps, '
+                  f'sim {stats["sim_time"]:.2f} s in {stats["wall_time"]:.3f} s wall, '
+                  f'{stats["steps_per_sec"]:.1f} steps/s, {stats["entity_steps_per_sec"]:.1f} entity-steps/s')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
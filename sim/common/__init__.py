@@ -1,3 +1,4 @@
 from .uav import Uav
 from .jammer import Jammer
 from .radar import Radar
+from .fleet import UavFleet
@@ -0,0 +1,220 @@
+"""
+无人机机群：以数组保存大量无人机的状态，查表完成状态转换，一次运算移动全部飞行中的无人机.
+"""
+
+from typing import List
+import numpy as np
+from .. import Entity
+from ..move import Track, TrackBatch, move_to_batch, move_on_track_batch
+from .rules import rule_uav_jammer, rule_types, dispatch
+from .uav import UavState, TRANSITIONS
+
+
+class FleetUav(Entity):
+    """ 机群中的单架无人机.
+
+    作为独立实体加入环境，供雷达、记录器等按实体访问. 属性读写机群数组，自身不交互、不步进.
+    """
+
+    def __init__(self, fleet, index: int, **kwargs):
+        super().__init__(**kwargs)
+        self.fleet = fleet
+        self.index = index
+
+    @property
+    def position(self):
+        return self.fleet.position[self.index]
+
+    @position.setter
+    def position(self, value):
+        self.fleet.position[self.index] = value
+
+    @property
+    def velocity(self):
+        return self.fleet.velocity[self.index]
+
+    @property
+    def life(self) -> float:
+        return float(self.fleet.life[self.index])
+
+    @life.setter
+    def life(self, value):
+        self.fleet.life[self.index] = value
+
+    @property
+    def speed(self) -> float:
+        return float(self.fleet.speed[self.index])
+
+    @speed.setter
+    def speed(self, value):
+        self.fleet.speed[self.index] = value
+
+    @property
+    def damage(self) -> float:
+        return float(self.fleet.damage[self.index])
+
+    @damage.setter
+    def damage(self, value):
+        self.fleet.damage[self.index] = value
+
+    @property
+    def state(self) -> UavState:
+        return UavState(int(self.fleet.state[self.index]))
+
+    @property
+    def track(self) -> Track:
+        return self.fleet.tracks[self.index]
+
+    @property
+    def wp_index(self) -> int:
+        return int(self.fleet.wp_index[self.index])
+
+    def is_alive(self) -> bool:
+        # 只判断本成员，不构造整个机群的活动数组.
+        fleet, i = self.fleet, self.index
+        return fleet.state[i] != UavState.OVER.value and fleet.wp_index[i] < fleet._counts[i]
+
+
+class UavFleet(Entity):
+    """ 无人机机群.
+
+    行为与逐架 Uav 相同：交互阶段根据规则更新条件 C0~C4，按状态转换表 (TRANSITIONS) 得到下一状态；
+    步进阶段按状态移动. 加入环境时同时加入各成员 (FleetUav).
+
+    规则只对机群以外的实体求值；规则提供 batch 形式 batch(positions, other) -> (动作, 布尔数组) 时
+    一次判断全部成员. 机群的交互不改变成员的可见状态（新状态在步进阶段生效），因此无需快照.
+
+    Attributes:
+        members: 成员列表.
+        tracks: 各成员航线.
+        position: 位置 (M, D).
+        velocity: 速度 (M, D).
+        life: 剩余飞行时间 (M,).
+        speed: 速度 (M,).
+        damage: 机体耐久 (M,).
+        state: 状态 (M,)，UavState 取值.
+        conditions: 最近一次交互的条件 C0~C4 (M, 5).
+        wp_index: 当前目标航点序号 (M,).
+    """
+
+    def __init__(self, tracks, **kwargs):
+        """ 初始化.
+
+        :param tracks: 各成员航线（航点列表或 Track）. 航线维度须相同.
+        :param life: 飞行时间，标量或 (M,).
+        :param speed: 速度，标量或 (M,).
+        :param damage: 机体耐久，标量或 (M,).
+        """
+        super().__init__(**kwargs)
+        self.tracks = [t if isinstance(t, Track) else Track(track=t) for t in tracks]
+        if not all(t.is_ok() for t in self.tracks):
+            raise ValueError('every fleet track needs at least two waypoints')
+        n = len(self.tracks)
+        self.members = [FleetUav(self, i) for i in range(n)]  # List[FleetUav]
+        self.life = np.full(n, 30.0)
+        self.speed = np.full(n, 3.0)
+        self.damage = np.full(n, 10.0)
+        self.state = np.full(n, UavState.START.value, dtype=np.int8)
+        self.conditions = np.zeros((n, 5), dtype=bool)
+        self.wp_index = np.ones(n, dtype=np.int64)
+        self.position = None
+        self.velocity = None
+        self.rules = [rule_uav_jammer]
+        self._batch = TrackBatch(self.tracks)
+        self._counts = self._batch.counts  # 各成员航点数.
+        self._starts = np.array([t.start() for t in self.tracks], dtype=np.float64)
+        self._pending = None  # 交互阶段得到的下一状态，步进阶段生效.
+        self.set_params(**kwargs)
+        self.reset()
+
+    def set_params(self, **kwargs):
+        for name in ('life', 'speed', 'damage'):
+            if name in kwargs:
+                value = np.broadcast_to(np.asarray(kwargs[name], dtype=np.float64), self.life.shape)
+                setattr(self, name, np.where(value > 0.0, value, getattr(self, name)))
+
+    def __len__(self):
+        return len(self.members)
+
+    def __getitem__(self, index) -> FleetUav:
+        return self.members[index]
+
+    def reset(self):
+        self.position = self._starts.copy()
+        self.velocity = np.zeros_like(self.position)
+        self._pending = None
+
+    def _attach(self, env):
+        super()._attach(env)
+        env.add_many([m for m in self.members if env.find(m) is None])
+
+    def _detach(self):
+        if self.env is not None:
+            for m in self.members:
+                self.env.remove(m)
+        super()._detach()
+
+    def alive(self) -> np.ndarray:
+        """ 各成员是否活动 (M,). """
+        return (self.state != UavState.OVER.value) & (self.wp_index < self._counts)
+
+    def is_alive(self) -> bool:
+        return bool(self.alive().any())
+
+    def is_passive(self) -> bool:
+        return True
+
+    def access_types(self):
+        return rule_types(self.rules)
+
+    def access(self, others):
+        idx = np.flatnonzero(self.alive())
+        jam = np.zeros(len(idx), dtype=bool)
+        gps = np.zeros(len(idx), dtype=bool)
+        others = [obj for obj in others if not (isinstance(obj, FleetUav) and obj.fleet is self)]
+        flags = {'jam': jam, 'gps': gps}
+        for rule, objs in dispatch(self.rules, others):
+            batch = getattr(rule, 'batch', None)
+            for other in objs:
+                if batch is not None:
+                    # 批量规则：一次判断全部成员.
+                    ret = batch(self.position[idx], other)
+                    if ret is not None and ret[0] in flags:
+                        flags[ret[0]] |= ret[1]
+                    continue
+                for k, i in enumerate(idx.tolist()):
+                    ret = rule(self.members[i], other)
+                    if ret is not None and ret[0] in flags:
+                        flags[ret[0]][k] = True
+
+        cond = np.stack([
+            self.life[idx] < 0.0,
+            jam,
+            gps,
+            self.wp_index[idx] >= self._counts[idx],
+            self.damage[idx] < 0.0,
+        ], axis=1)
+        self.conditions[idx] = cond
+        code = cond.astype(np.int64) @ (1 << np.arange(5))
+        self._pending = (idx, TRANSITIONS[self.state[idx], code])
+
+    def step(self, time_info):
+        _, dt = time_info
+        if self._pending is not None:
+            idx, state = self._pending
+            self.state[idx] = state
+            self._pending = None
+        idx = np.flatnonzero(self.alive())
+        last = self.position[idx]
+
+        fly = idx[self.state[idx] == UavState.FLY.value]
+        if len(fly):
+            pos = self.position[fly]
+            self.wp_index[fly] = move_on_track_batch(pos, self._batch, self.wp_index[fly], dt * self.speed[fly], fly)
+            self.position[fly] = pos
+        back = idx[self.state[idx] == UavState.RETURN.value]
+        if len(back):
+            self.position[back] = move_to_batch(self.position[back], self._starts[back], dt * self.speed[back])[0]
+
+        self.velocity[idx] = (self.position[idx] - last) / dt if dt > 0 else 0.0
+        self.life[idx] -= dt
@@ -1,9 +1,154 @@
-from .. import Entity
+import math
+from typing import Optional
+import numpy as np
+from .. import Entity, vec
+from ..move import in_range_batch
 
 
 class Jammer(Entity):
-    """ 干扰机. """
+    """ 干扰机.
+
+    未指定位置或作用距离时，开机后干扰全部无人机. 指定位置和作用距离后，只干扰覆盖范围内的无人机：
+    距离不超过 range，且方位（正北顺时针，度）在 a_range 内（指定时，用于定向干扰）.
+
+    指定 raster 时，开机时按该网格边长在水平面 (x, y) 上预先计算覆盖栅格，之后覆盖判断为一次栅格查找.
+    每个网格保存网格中心处允许的最大高度差（不覆盖时为 -1），三维位置的高度按该值解析判断；
+    栅格大小与作用距离的平方成正比，与高度无关. 水平方向按网格中心判断覆盖，边界附近的精度为一个网格.
+    适用于位置固定的干扰机；位置或覆盖参数变化后（set_params）栅格重新计算.
+    栅格网格数超过 MAX_RASTER_CELLS 时报错.
+
+    干扰机与无人机位置维度不同时（二维与三维），只比较共有的水平坐标 (x, y)，不判断高度.
+
+    干扰类型只决定干扰效果（测控或 GPS），覆盖范围由 range 和 a_range 决定，与类型无关.
+
+    Attributes:
+        kind: 干扰类型. 'jam': 测控链路干扰；'gps': GPS 干扰.
+        position: 位置. None 表示不限位置.
+        range: 作用距离. None 表示不限距离.
+        a_range: 方位范围. None 表示全向.
+        raster: 覆盖栅格网格边长. None 表示每次按几何关系判断.
+    """
+
+    MAX_RASTER_CELLS = 16_000_000  # 覆盖栅格网格数上限（约 64 MB）.
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.power_on = False
-        self.kind = kwargs['kind'] if 'kind' in kwargs else 'jam'
+        self._power_on = False
+        self.kind = 'jam'
+        self.position = None
+        self.range = None
+        self.a_range = None
+        self.raster = None
+        self._grid = None  # 覆盖栅格 (水平原点, 最大高度差 (n, n))，开机时计算.
+        self.set_params(**kwargs)
+
+    def set_params(self, **kwargs):
+        if 'kind' in kwargs:
+            self.kind = kwargs['kind']
+        if 'pos' in kwargs:
+            self.position = vec.vec(kwargs['pos']) if kwargs['pos'] is not None else None
+        if 'range' in kwargs:
+            self.range = float(kwargs['range']) if kwargs['range'] is not None else None
+        if 'a_range' in kwargs:
+            self.a_range = kwargs['a_range']
+        if 'raster' in kwargs:
+            self.raster = float(kwargs['raster']) if kwargs['raster'] else None
+        if 'power_on' in kwargs:
+            self._power_on = bool(kwargs['power_on'])
+        self._grid = None
+        if self._power_on:
+            self._build_grid()
+
+    @property
+    def power_on(self) -> bool:
+        return self._power_on
+
+    @power_on.setter
+    def power_on(self, value):
+        self._power_on = bool(value)
+        if self._power_on and self._grid is None:
+            self._build_grid()
+
+    def is_global(self) -> bool:
+        """ 是否干扰全部无人机（未限定位置或作用距离）. """
+        return self.position is None or self.range is None
+
+    def covers(self, point) -> bool:
+        """ 位置是否在覆盖范围内（不考虑开关机）. """
+        if self.is_global():
+            return True
+        if point is None:
+            return False
+        point = np.asarray(point, dtype=np.float64)
+        if self._grid is not None:
+            origin, dz = self._grid
+            i = math.floor((point[0] - origin[0]) / self.raster)
+            j = math.floor((point[1] - origin[1]) / self.raster)
+            if not (0 <= i < dz.shape[0] and 0 <= j < dz.shape[1]):
+                return False
+            h = dz[i, j]
+            if len(point) < 3 or len(self.position) < 3:
+                return h >= 0.0
+            return h >= 0.0 and abs(point[2] - self.position[2]) <= h
+        return bool(self._geometric(point[None, :])[0])
+
+    def covers_batch(self, points) -> np.ndarray:
+        """ 各位置是否在覆盖范围内（批量，不考虑开关机）.
+
+        :param points: 位置 (M, D).
+        :return: 布尔数组 (M,).
+        """
+        points = np.asarray(points, dtype=np.float64)
+        if self.is_global():
+            return np.ones(len(points), dtype=bool)
+        if self._grid is not None:
+            return self._lookup(points)
+        return self._geometric(points)
+
+    def _geometric(self, points) -> np.ndarray:
+        k = min(points.shape[1], len(self.position))  # 维度不同时只比较共有坐标.
+        d = points[:, :k] - self.position[:k]
+        mask = np.einsum('ij,ij->i', d, d) <= self.range ** 2
+        if self.a_range is not None:
+            a = np.degrees(np.arctan2(d[:, 0], d[:, 1]))
+            mask &= in_range_batch(a, self.a_range, 'a')
+        return mask
+
+    def _build_grid(self):
+        """ 计算覆盖栅格. 按行分块计算，不生成全部网格中心坐标. """
+        if self.raster is None or self.is_global():
+            return
+        cell = self.raster
+        n = int(math.ceil(2 * self.range / cell)) + 1
+        if n * n > self.MAX_RASTER_CELLS:
+            raise ValueError(f'jammer raster of {n}x{n} cells exceeds {self.MAX_RASTER_CELLS} cells; '
+                             f'use a larger raster cell than {cell} for range {self.range}')
+        origin = self.position[:2] - self.range
+        xs = (np.arange(n) + 0.5) * cell - self.range  # 网格中心相对干扰机的坐标.
+        dz = np.empty((n, n), dtype=np.float32)
+        rows = max(1, (1 << 20) // n)
+        for s in range(0, n, rows):
+            dx = xs[s:s + rows, None]
+            h2 = self.range ** 2 - (dx ** 2 + xs[None, :] ** 2)
+            block = np.where(h2 >= 0.0, np.sqrt(np.maximum(h2, 0.0)), -1.0)
+            if self.a_range is not None:
+                a = np.degrees(np.arctan2(np.broadcast_to(dx, h2.shape), xs[None, :]))
+                block[~in_range_batch(a, self.a_range, 'a')] = -1.0
+            dz[s:s + rows] = block
+        self._grid = origin, dz
+
+    def _lookup(self, points) -> np.ndarray:
+        origin, dz = self._grid
+        keys = np.floor((points[:, :2] - origin) / self.raster).astype(np.int64)
+        inside = np.all((keys >= 0) & (keys < dz.shape[0]), axis=1)
+        mask = np.zeros(len(points), dtype=bool)
+        h = dz[keys[inside, 0], keys[inside, 1]]
+        if points.shape[1] >= 3 and len(self.position) >= 3:
+            mask[inside] = (h >= 0.0) & (np.abs(points[inside, 2] - self.position[2]) <= h)
+        else:
+            mask[inside] = h >= 0.0
+        return mask
+
+    def coverage(self) -> Optional[np.ndarray]:
+        """ 水平面覆盖栅格（布尔数组 [x, y]）. 未启用栅格或尚未开机时为 None. """
+        return self._grid[1] >= 0.0 if self._grid is not None else None
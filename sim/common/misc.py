@@ -51,6 +51,21 @@ class Fov:
             return None
         return aer
 
+    def view_batch(self, targets, pos, dir_=None) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """ 批量观察目标.
+
+        :param targets: 目标位置数组 (N, 3).
+        :param pos: 观察地点.
+        :param dir_: 观察轴线方向.
+        :return: (可见标记 (N,), 目标方位 AER (N, 3)).
+        """
+        aer = move.xyz_to_aer_batch(targets, pos)
+        return self.in_range_batch(aer), aer
+
+    def in_range_batch(self, aer):
+        return move.in_range_batch(aer[:, 2], self.r_range) & move.in_range_batch(aer[:, 0], self.a_range, 'a') \
+               & move.in_range_batch(aer[:, 1], self.e_range, 'e')
+
     def in_range(self, aer):
         a, e, r = aer[0], aer[1], aer[2]
         return move.in_range(r, self.r_range) and move.in_range(a, self.a_range, 'a') \
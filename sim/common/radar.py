@@ -1,3 +1,4 @@
+import heapq
 import math
 from collections import namedtuple
 from typing import Tuple
@@ -26,6 +27,8 @@ class Radar(Entity):
         :param r_range: 距离范围.
         :param rate: 刷新时间间隔 (s).
         :param remove: 消批时间 (s).
+        :param interaction_radius: 交互半径. 默认取距离范围上限.
+        :param update_period: 更新周期 (s). 可设为 rate，只在刷新时探测.
         """
         super().__init__(**kwargs)
         self.position = vec.vec([0, 0])  # 位置.
@@ -36,23 +39,40 @@ class Radar(Entity):
     def set_params(self, **kwargs):
         if 'pos' in kwargs:
             self.position = vec.vec(kwargs['pos'])
+        r_range = self.sensor.fov.r_range
+        if self.interaction_radius is None and r_range is not None and r_range[1] is not None:
+            self.interaction_radius = float(r_range[1])
 
     def step(self, time_info):
         pass
 
     def access(self, others):
         t, _ = self.env.time_info
-        temp_results = {}
-        for other in others:
-            if other.is_alive():
-                ret = self.sensor.detect(other)
-                if ret is not None:
-                    temp_results[other.id] = ret
-        self.result.accept(temp_results, t)
+        targets = [other for other in others if other.is_alive()]
+        self.result.accept(self.sensor.detect_batch(targets), t)
 
     def reset(self):
         self.result.reset()
 
+    def wake_time(self, time_info):
+        """ 下次需要处理的时间：最早一条航迹可刷新的时间.
+
+        有航迹已到刷新时间但未刷新（目标不在视场内）时每步处理，以便目标再次出现时及时刷新；
+        没有航迹时按刷新间隔搜索新目标.
+        """
+        now, dt = time_info
+        t = self.result.next_refresh()
+        if t is None:
+            return now + self.result.rate
+        if t <= now:
+            return now + dt
+        # 提前半步，避免浮点误差错过刷新所在步点（提前处理不影响结果）.
+        return t - 0.5 * dt
+
+    def is_passive(self) -> bool:
+        # access 只更新共享的结果管理器，快照无需拷贝.
+        return True
+
     @property
     def results(self):
         """ 当前有效结果（包含部分为了维持批号的结果）"""
@@ -75,13 +95,19 @@ RadarResult = namedtuple('RadarResult', ['bid', 'time', 'count', 'value'])
 
 
 class ResultManager:
-    """ 结果管理器. """
+    """ 结果管理器.
+
+    维护按更新时间排序的过期堆和按时间的更新索引，过期检查和最新结果查询的开销
+    只与变化的航迹数相关.
+    """
 
     def __init__(self, **kwargs):
         self._results = {}  # 全部结果.
         self._batch_id = 0  # 结果批号.
         self._time_recv = 1.0  # 数据接收间隔
         self._time_del = 6.0  # 数据删除间隔.
+        self._expiry = []  # 过期堆 [(更新时间, 目标 id)]，含已被后续更新取代的条目.
+        self._by_time = {}  # 更新时间 -> 目标 id 集合.
         self.set_params(**kwargs)
 
     def set_params(self, **kwargs):
@@ -93,18 +119,30 @@ class ResultManager:
     def reset(self):
         self._results.clear()
         self._batch_id = 0
+        self._expiry.clear()
+        self._by_time.clear()
 
     def results(self):
         return self._results
 
+    @property
+    def rate(self) -> float:
+        """ 数据接收间隔. """
+        return self._time_recv
+
+    def next_refresh(self):
+        """ 最早一条航迹可刷新的时间. 没有航迹时返回 None. """
+        while self._expiry:
+            tp, obj_id = self._expiry[0]
+            ret = self._results.get(obj_id)
+            if ret is not None and ret.time == tp:
+                return tp + self._time_recv
+            heapq.heappop(self._expiry)  # 已被后续更新取代的条目.
+        return None
+
     def current_results(self, t):
         """ 最新结果. """
-        ret = {}
-        for k, v in self._results.items():
-            _, tp, _, _ = v
-            if tp == t:
-                ret[k] = v
-        return ret
+        return {k: self._results[k] for k in self._by_time.get(t, ())}
 
     def accept(self, curr_results, t):
         """ 合并结果.  """
@@ -113,19 +151,32 @@ class ResultManager:
             if obj_id in self._results:
                 bid, tp, count, _ = self._results[obj_id]
                 if t - tp >= self._time_recv:
+                    self._untrack(obj_id, tp)
                     self._results[obj_id] = RadarResult(bid, t, count + 1, ret)
+                    self._track(obj_id, t)
             else:
                 self._batch_id += 1
                 self._results[obj_id] = RadarResult(self._batch_id, t, 1, ret)
+                self._track(obj_id, t)
 
         # 删除过期结果.
-        del_ids = []
-        for obj_id, ret in self._results.items():
-            _, tp, _, _ = self._results[obj_id]
-            if t - tp >= self._time_del:
-                del_ids.append(obj_id)
-        for eid in del_ids:
-            self._results.pop(eid)
+        while self._expiry and t - self._expiry[0][0] >= self._time_del:
+            tp, obj_id = heapq.heappop(self._expiry)
+            ret = self._results.get(obj_id)
+            if ret is not None and ret.time == tp:
+                self._results.pop(obj_id)
+                self._untrack(obj_id, tp)
+
+    def _track(self, obj_id, t):
+        heapq.heappush(self._expiry, (t, obj_id))
+        self._by_time.setdefault(t, set()).add(obj_id)
+
+    def _untrack(self, obj_id, t):
+        ids = self._by_time.get(t)
+        if ids is not None:
+            ids.discard(obj_id)
+            if not ids:
+                self._by_time.pop(t)
 
 
 class Sensor:
@@ -146,11 +197,40 @@ class Sensor:
             return ret
         return None
 
+    def detect_batch(self, others) -> dict:
+        """ 批量探测. 一次计算全部目标方位，按视场筛选.
+
+        :param others: 目标列表.
+        :return: {目标 id: 探测结果}.
+        """
+        targets = [other for other in others if _is_xyz(getattr(other, 'position', None))]
+        if not targets:
+            return {}
+        pts = np.array([other.position for other in targets], dtype=np.float64)
+        mask, aer = self.fov.view_batch(pts, pos=self.position)
+        idx = np.flatnonzero(mask).tolist()
+        if self.detect_policy is None:
+            return {targets[i].id: tuple(aer[i].tolist()) for i in idx}
+        policy = self.detect_policy
+        if isinstance(policy, partial) and policy.func is detect_aer and not policy.keywords.get('attribs'):
+            rets = format_aer(aer[idx], policy.keywords.get('out', 'aer'))
+            return {targets[i].id: ret for i, ret in zip(idx, rets)}
+        ret = {}
+        for i in idx:
+            v = policy(self, targets[i])
+            if v is not None:
+                ret[targets[i].id] = v
+        return ret
+
     @property
     def position(self):
         return self.parent.position
 
 
+def _is_xyz(pos) -> bool:
+    return isinstance(pos, np.ndarray) and pos.shape == (3,)
+
+
 def check_attribs(obj, attribs=None) -> bool:
     """ 检查对象是否包含属性. """
     if attribs:
@@ -160,6 +240,20 @@ def check_attribs(obj, attribs=None) -> bool:
     return True
 
 
+def format_aer(aer, out='aer') -> list:
+    """ 批量生成观测值，格式同 detect_aer.
+
+    :param aer: AER 数组 (N, 3).
+    :param out: 输出格式.
+    :return: 观测值列表.
+    """
+    cols = {'a': [0], 'r': [2], 'ae': [0, 1], 'ar': [0, 2]}.get(out, [0, 1, 2])
+    values = aer[:, cols].tolist()
+    if len(cols) == 1:
+        return [v[0] for v in values]
+    return [tuple(v) for v in values]
+
+
 def detect_aer(sensor, target, out='aer', attribs=None):
     """ 获取对象观测值. """
     if check_attribs(target, attribs):
@@ -1,9 +1,64 @@
+from typing import Optional
 from .jammer import Jammer
 
 
+def applies_to(*types):
+    """ 声明交互规则适用的实体类型（装饰器）. 未声明类型的规则适用于所有实体. """
+    def wrap(rule):
+        rule.types = types
+        return rule
+    return wrap
+
+
+def rule_types(rules) -> Optional[tuple]:
+    """ 规则适用类型的并集. 有规则未声明类型时返回 None（适用于所有实体）. """
+    types = []
+    for rule in rules:
+        declared = getattr(rule, 'types', None)
+        if declared is None:
+            return None
+        types.extend(t for t in declared if t not in types)
+    return tuple(types)
+
+
+def dispatch(rules, others):
+    """ 按类型为每条规则筛选交互对象.
+
+    :param rules: 规则列表.
+    :param others: 交互对象.
+    :return: [(规则, 适用的交互对象列表)].
+    """
+    buckets = {}  # 类型 -> 交互对象.
+    for other in others:
+        buckets.setdefault(type(other), []).append(other)
+    ret = []
+    for rule in rules:
+        declared = getattr(rule, 'types', None)
+        if declared is None:
+            ret.append((rule, others))
+        else:
+            ret.append((rule, [o for cls, objs in buckets.items() if issubclass(cls, declared) for o in objs]))
+    return ret
+
+
+@applies_to(Jammer)
 def rule_uav_jammer(uav, jammer):
-    """ UAV 与 Jammer 交互规则. """
-    if isinstance(jammer, Jammer):
-        if jammer.power_on:
-            return jammer.kind, 1
+    """ UAV 与 Jammer 交互规则. 干扰机开机且 UAV 在其覆盖范围内时受到干扰. """
+    if jammer.power_on and jammer.covers(uav.position):
+        return jammer.kind, 1
     return None
+
+
+def _rule_uav_jammer_batch(positions, jammer):
+    """ rule_uav_jammer 的批量形式.
+
+    :param positions: 各 UAV 位置 (M, D).
+    :param jammer: 干扰机.
+    :return: (动作, 受影响的布尔数组 (M,))，或 None.
+    """
+    if jammer.power_on:
+        return jammer.kind, jammer.covers_batch(positions)
+    return None
+
+
+rule_uav_jammer.batch = _rule_uav_jammer_batch
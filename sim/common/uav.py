@@ -1,8 +1,8 @@
 from enum import Enum
-import copy
+import numpy as np
 from .. import Entity, vec
 from ..move import Track, move_to, move_on_track
-from .rules import rule_uav_jammer
+from .rules import rule_uav_jammer, rule_types, dispatch
 
 
 class Uav(Entity):
@@ -19,6 +19,7 @@ class Uav(Entity):
         self.position = None
         self.velocity = None
         self.rules = [rule_uav_jammer]
+        self.batched = False  # 是否由集合运行 (Ensemble) 跨副本批量计算.
         self.set_params(**kwargs)
         self.reset()
 
@@ -30,7 +31,7 @@ class Uav(Entity):
 
     def reset(self):
         if self.track.is_ok():
-            self.position = self.track.start()
+            self.position = self.track.start().copy()
             self.velocity = vec.zeros_like(self.position)
 
     def step(self, time_info):
@@ -38,10 +39,20 @@ class Uav(Entity):
         self.control.move(time_info)
         self.life -= dt
 
+    def has_access(self) -> bool:
+        return not self.batched
+
+    def has_step(self) -> bool:
+        return not self.batched
+
+    def access_types(self):
+        # 只接收交互规则声明的实体类型.
+        return rule_types(self.rules)
+
     def access(self, others):
         actions = {}
-        for other in others:
-            for rule in self.rules:
+        for rule, objs in dispatch(self.rules, others):
+            for other in objs:
                 ret = rule(self, other)
                 if ret is not None:
                     k, v = ret
@@ -50,6 +61,13 @@ class Uav(Entity):
                     actions[k].append(v)
         self.control.take(actions)
 
+    def wake_time(self, time_info):
+        # 悬停时只需在电池耗尽后处理；状态变化由干扰等事件触发.
+        now, dt = time_info
+        if self.control.state == UavState.HOVER and type(self).step is Uav.step:
+            return now + dt + max(self.life, 0.0)
+        return now + dt
+
     def is_alive(self) -> bool:
         c1 = self.control.state != UavState.OVER
         c2 = self.track.is_ok()
@@ -66,6 +84,60 @@ class UavState(Enum):
     OVER = 4  # 结束.
 
 
+def next_state(state: UavState, c0, c1, c2, c3, c4) -> UavState:
+    """ 状态转换（见 docs/uav.md 状态转换矩阵）.
+
+    :param state: 当前状态.
+    :param c0: 电池耗尽.
+    :param c1: 测控被干扰.
+    :param c2: GPS被干扰.
+    :param c3: 航路飞完.
+    :param c4: 机体损坏.
+    :return: 下一状态.
+    """
+    if state == UavState.START:
+        if c0 or c4:
+            return UavState.OVER
+        elif c1 or c2:
+            return UavState.START
+        else:
+            return UavState.FLY
+    elif state == UavState.FLY:
+        if c0 or c3 or c4:
+            return UavState.OVER
+        elif c1 or c2:
+            return UavState.HOVER
+    elif state == UavState.RETURN:
+        if c0 or c4:
+            return UavState.OVER
+        elif c1 and not c2:
+            return UavState.RETURN
+        else:
+            return UavState.HOVER
+    elif state == UavState.HOVER:
+        if c0 or c4:
+            return UavState.OVER
+        elif c2:
+            return UavState.HOVER
+        elif c1 and not c2:
+            return UavState.RETURN
+        elif not (c1 or c2 or c3):
+            return UavState.FLY
+    return state
+
+
+def _transition_table() -> np.ndarray:
+    """ 状态转换表 [当前状态, 条件编码] -> 下一状态. 条件编码第 k 位为 Ck. """
+    table = np.zeros((len(UavState), 32), dtype=np.int8)
+    for state in UavState:
+        for code in range(32):
+            table[state.value, code] = next_state(state, *[bool(code >> k & 1) for k in range(5)]).value
+    return table
+
+
+TRANSITIONS = _transition_table()
+
+
 class UavControl:
     """ 无人机飞行控制.
     """
@@ -78,39 +150,13 @@ class UavControl:
         self.C2 = False  # GPS被干扰（无输出）
         self.C3 = False  # 航路飞完
         self.C4 = False  # 机体损坏
+        self._last = None  # 上一步位置缓冲区.
 
     def take(self, actions):
         """ 根据接收动作，更新状态机.
         """
         self._update_conditions(actions)
-        if self.state == UavState.START:
-            if self.C0 or self.C4:
-                self.state = UavState.OVER
-            elif self.C1 or self.C2:
-                self.state = UavState.START
-            else:
-                self.state = UavState.FLY
-        elif self.state == UavState.FLY:
-            if self.C0 or self.C3 or self.C4:
-                self.state = UavState.OVER
-            elif self.C1 or self.C2:
-                self.state = UavState.HOVER
-        elif self.state == UavState.RETURN:
-            if self.C0 or self.C4:
-                self.state = UavState.OVER
-            elif self.C1 and not self.C2:
-                self.state = UavState.RETURN
-            else:
-                self.state = UavState.HOVER
-        elif self.state == UavState.HOVER:
-            if self.C0 or self.C4:
-                self.state = UavState.OVER
-            elif self.C2:
-                self.state = UavState.HOVER
-            elif self.C1 and not self.C2:
-                self.state = UavState.RETURN
-            elif not (self.C1 or self.C2 or self.C3):
-                self.state = UavState.FLY
+        self.state = next_state(self.state, self.C0, self.C1, self.C2, self.C3, self.C4)
 
     def _update_conditions(self, actions):
         """ 判断状态. """
@@ -121,11 +167,20 @@ class UavControl:
         self.C4 = self.uav.damage < 0.0
 
     def move(self, time_info):
-        pos = copy.copy(self.uav.position)
+        """ 按状态移动. 位置和速度原地更新，不分配新数组. """
+        uav = self.uav
         _, dt = time_info
+        if self._last is None or self._last.shape != uav.position.shape:
+            self._last = vec.zeros_like(uav.position)
+        if uav.velocity is None or uav.velocity.shape != uav.position.shape:
+            uav.velocity = vec.zeros_like(uav.position)
+        np.copyto(self._last, uav.position)
         if self.state == UavState.FLY:
-            pos = move_on_track(pos, self.uav.track, dt * self.uav.speed)
+            move_on_track(uav.position, uav.track, dt * uav.speed, out=uav.position)
         elif self.state == UavState.RETURN:
-            pos, _ = move_to(pos, self.uav.track.start(), dt * self.uav.speed)
-        self.uav.velocity = (pos - self.uav.position) / dt if dt > 0 else vec.zeros_like(pos)
-        self.uav.position = pos
+            move_to(uav.position, uav.track.start(), dt * uav.speed, out=uav.position)
+        if dt > 0:
+            np.subtract(uav.position, self._last, out=uav.velocity)
+            uav.velocity /= dt
+        else:
+            uav.velocity.fill(0.0)
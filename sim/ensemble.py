@@ -0,0 +1,308 @@
+"""
+集合运行：在同一进程中同步推进同一场景的 K 个副本（初始状态或随机数种子不同）.
+
+各副本的运动实体共享一个状态存储，每步只做一次向量化积分；各副本中相同位置的成对作用力
+(PairwiseForce) 合并为一次 (K, N, D) 数组运算；全部副本中的无人机 (Uav) 按机群 (UavFleet)
+的方式以数组完成规则判断、状态转换和移动；只由状态存储驱动的运动实体不再逐个遍历.
+适合小场景：此时每步的解释器开销占主导，进程池并行收益有限.
+
+以下实体仍在各自副本中按原方式交互和步进，副本中只有这类实体时集合运行与逐个副本运行速度相当：
+Uav 的子类、交互规则不全有批量形式 (rule.batch) 或未声明适用类型的 Uav、设置了交互半径或更新周期的 Uav，
+以及其他有交互或步进动作的实体.
+
+集合运行期间批量计算的实体在副本中被标记为 batched，副本环境不再处理；
+副本需要单独运行时先调用 release（或以 with 语句使用集合）.
+
+Usages:
+    def build(seed):
+        rng = np.random.default_rng(seed)
+        env = Environment()
+        ...
+        return env
+
+    with Ensemble(build, seeds=range(100)) as ensemble:
+        recorder = EnsembleRecorder('pos')
+        ensemble.step_events.append(recorder)
+        ensemble.run(stop=100.0)
+    recorder.records  # {实体序号: (K, T, ...)}
+"""
+
+from typing import Callable, Iterable, List, Optional
+import numpy as np
+from . import Environment
+from .common.rules import rule_types, dispatch
+from .common.uav import Uav, UavState, TRANSITIONS
+from .interact import PairwiseForce
+from .move import MoveEntity, TrackBatch, move_to_batch, move_on_track_batch
+from .recorder import ArrayColumn
+from .store import StateStore
+
+
+def _is_batchable_uav(obj) -> bool:
+    """ 无人机能否跨副本批量计算. """
+    return type(obj) is Uav and obj.track.is_ok() and obj.interaction_radius is None \
+        and obj.update_period is None and rule_types(obj.rules) is not None \
+        and all(callable(getattr(rule, 'batch', None)) for rule in obj.rules)
+
+
+class _UavBatch:
+    """ 全部副本中同一维度的无人机.
+
+    数组只是每步的临时数据：每步从各 Uav 读入状态，计算后写回，Uav 对象仍是状态的唯一来源.
+    """
+
+    def __init__(self, uavs: List[Uav], owners: List[Environment]):
+        self.uavs = uavs
+        self.tracks = TrackBatch([uav.track for uav in uavs])
+        self.starts = np.array([uav.track.start() for uav in uavs], dtype=np.float64)
+        groups = {}  # (副本, 规则) -> [副本, 规则, 交互对象候选, 成员序号]
+        for i, (uav, env) in enumerate(zip(uavs, owners)):
+            key = (id(env), tuple(uav.rules))
+            if key not in groups:
+                types = rule_types(uav.rules)
+                groups[key] = [uav.rules, [obj for obj in env.children if isinstance(obj, types)], []]
+            groups[key][2].append(i)
+        self.groups = [(rules, candidates, np.asarray(idx)) for rules, candidates, idx in groups.values()]
+        self.state = None
+        self.wp_index = None
+        self.position = None
+
+    def _alive(self) -> np.ndarray:
+        return (self.state != UavState.OVER.value) & (self.wp_index < self.tracks.counts)
+
+    def access(self):
+        """ 交互阶段：按规则更新条件 C0~C4，查表得到下一状态. """
+        uavs = self.uavs
+        self.state = np.array([uav.control.state.value for uav in uavs], dtype=np.int8)
+        self.wp_index = np.array([uav.track.wp_index for uav in uavs], dtype=np.int64)
+        self.position = np.array([uav.position for uav in uavs], dtype=np.float64)
+        alive = self._alive()
+        flags = {'jam': np.zeros(len(uavs), dtype=bool), 'gps': np.zeros(len(uavs), dtype=bool)}
+        for rules, candidates, idx in self.groups:
+            idx = idx[alive[idx]]
+            if not len(idx):
+                continue
+            others = [obj for obj in candidates if obj.is_alive()]
+            for rule, objs in dispatch(rules, others):
+                for other in objs:
+                    ret = rule.batch(self.position[idx], other)
+                    if ret is not None and ret[0] in flags:
+                        flags[ret[0]][idx] |= ret[1]
+
+        cond = np.stack([
+            np.array([uav.life for uav in uavs], dtype=np.float64) < 0.0,
+            flags['jam'],
+            flags['gps'],
+            self.wp_index >= self.tracks.counts,
+            np.array([uav.damage for uav in uavs], dtype=np.float64) < 0.0,
+        ], axis=1)
+        state = TRANSITIONS[self.state, cond.astype(np.int64) @ (1 << np.arange(5))]
+        for i in np.flatnonzero(alive).tolist():
+            control = uavs[i].control
+            control.C0, control.C1, control.C2, control.C3, control.C4 = cond[i].tolist()
+            if state[i] != self.state[i]:
+                control.state = UavState(int(state[i]))
+                self.state[i] = state[i]
+
+    def step(self, dt: float):
+        """ 步进阶段：按状态移动. """
+        idx = np.flatnonzero(self._alive())
+        last = self.position[idx]
+        fly = idx[self.state[idx] == UavState.FLY.value]
+        if len(fly):
+            speed = np.array([self.uavs[i].speed for i in fly.tolist()], dtype=np.float64)
+            pos = self.position[fly]
+            self.wp_index[fly] = move_on_track_batch(pos, self.tracks, self.wp_index[fly], dt * speed, fly)
+            self.position[fly] = pos
+        back = idx[self.state[idx] == UavState.RETURN.value]
+        if len(back):
+            speed = np.array([self.uavs[i].speed for i in back.tolist()], dtype=np.float64)
+            self.position[back] = move_to_batch(self.position[back], self.starts[back], dt * speed)[0]
+        velocity = (self.position[idx] - last) / dt if dt > 0 else np.zeros_like(last)
+
+        for k, i in enumerate(idx.tolist()):
+            uav = self.uavs[i]
+            np.copyto(uav.position, self.position[i])
+            if uav.velocity is None or uav.velocity.shape != uav.position.shape:
+                uav.velocity = velocity[k].copy()
+            else:
+                np.copyto(uav.velocity, velocity[k])
+            uav.track.wp_index = int(self.wp_index[i])
+            uav.life -= dt
+
+
+class Ensemble:
+    """ 集合运行.
+
+    Attributes:
+        envs: 各副本环境.
+        seeds: 各副本随机数种子.
+        store: 共享状态存储.
+        step_events: 每步调用的事件 evt(ensemble)，在状态积分之后、副本事件之前调用.
+    """
+
+    def __init__(self, factory: Callable, seeds: Iterable[int]):
+        """ 初始化.
+
+        :param factory: 场景构建函数 factory(seed) -> Environment. 各副本须具有相同的实体结构，
+            同一位置的 PairwiseForce 采用第一个副本的作用规律和截断距离.
+        :param seeds: 各副本随机数种子.
+        """
+        self.seeds = list(seeds)
+        self.store = StateStore()
+        self.envs = []  # List[Environment]
+        for seed in self.seeds:
+            env = factory(seed)
+            env.share_store(self.store)
+            self.envs.append(env)
+        self.step_events = []
+        self._key = None  # 分类缓存对应的各副本成员变化计数.
+        self._forces = []  # [[各副本中同一位置的 PairwiseForce]]
+        self._uavs = []  # [_UavBatch]
+        self._batched = []  # 标记为 batched 的实体.
+        self._scalar = []  # 各副本是否需要逐实体处理.
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    @property
+    def time_info(self):
+        return self.envs[0].time_info
+
+    def set_params(self, **kwargs):
+        if kwargs.get('advance', 'fixed') != 'fixed':
+            raise ValueError('ensemble runs only support fixed-step advance')
+        for env in self.envs:
+            env.set_params(**kwargs)
+
+    def is_over(self) -> bool:
+        return self.envs[0].is_over()
+
+    def reset(self):
+        for env, seed in zip(self.envs, self.seeds):
+            env.set_params(seed=seed)
+            env.reset()
+
+    def run(self, **kwargs):
+        """ 运行. 参数同 Environment.run（不支持事件推进和实时运行）. """
+        self.set_params(**kwargs)
+        self.reset()
+        while not self.is_over():
+            self.step()
+
+    def step(self):
+        """ 所有副本同步步进一次. """
+        assert not self.is_over()
+        self._classify()
+        _, dt = self.time_info
+        for forces in self._forces:
+            self._apply_forces(forces, dt)
+        for uavs in self._uavs:
+            uavs.access()
+        ts = [env._update() if scalar else 0.0 for env, scalar in zip(self.envs, self._scalar)]
+        for uavs in self._uavs:
+            uavs.step(dt)
+        self.store.integrate(dt)
+        for evt in self.step_events:
+            evt(self)
+        for env, t in zip(self.envs, ts):
+            env._finish(t)
+
+    def release(self):
+        """ 恢复由集合批量计算的实体，副本之后可单独运行. """
+        for obj in self._batched:
+            obj.batched = False
+        self._batched = []
+        self._forces = []
+        self._uavs = []
+        self._key = None
+        for env in self.envs:
+            env.touch()
+
+    def _classify(self):
+        """ 成员变化时重新划分批量计算的实体和需要逐实体处理的副本. """
+        key = tuple(env.members_version for env in self.envs)
+        if key == self._key:
+            return
+        self.release()
+        forces, uavs = {}, {}
+        for env in self.envs:
+            for i, obj in enumerate(env.children):
+                if isinstance(obj, PairwiseForce):
+                    forces.setdefault(i, []).append(obj)
+                elif _is_batchable_uav(obj):
+                    uavs.setdefault(len(obj.position), []).append((obj, env))
+        for obj in [f for group in forces.values() for f in group] + [u for group in uavs.values() for u, _ in group]:
+            obj.batched = True
+            self._batched.append(obj)
+        self._forces = list(forces.values())
+        self._uavs = [_UavBatch([u for u, _ in group], [env for _, env in group]) for group in uavs.values()]
+        for env in self.envs:
+            env.touch()
+        # 只剩空闲实体（无交互和步进动作）的副本无需逐实体处理.
+        self._scalar = [any(obj.has_access() or obj.has_step() for obj in env.children) for env in self.envs]
+        self._key = tuple(env.members_version for env in self.envs)
+
+    @staticmethod
+    def _apply_forces(forces: List[PairwiseForce], dt: float):
+        """ 批量计算各副本中同一位置的成对作用力. """
+        forces = [f for f in forces if f.is_alive() and f._update_members()]
+        if not forces:
+            return
+        block = forces[0]._block
+        if any(f._block is not block or len(f._slots) != len(forces[0]._slots) for f in forces):
+            for f in forces:  # 成员数不同，逐副本计算.
+                f._block.vel[f._slots] += forces[0].accelerations(f._block.pos[f._slots], f._masses) * dt
+            return
+        slots = np.stack([f._slots for f in forces])  # (K, N)
+        masses = np.stack([f._masses for f in forces])
+        block.vel[slots] += forces[0].accelerations(block.pos[slots], masses) * dt
+
+
+class EnsembleRecorder:
+    """ 集合属性记录：每步记录各副本中同一位置实体的属性.
+
+    Attributes:
+        records: {实体序号: 数组 (K, T, ...)}.
+        times: 记录时间 (T,).
+    """
+
+    def __init__(self, prop_name: str, members: Optional[List[int]] = None, chunk=1024):
+        """ 初始化.
+
+        :param prop_name: 属性名称（数值属性）.
+        :param members: 记录的实体序号（在副本 children 中的位置）. 默认为第一个副本中具有该属性的全部实体.
+        :param chunk: 列式存储每块行数.
+        """
+        self.prop_name = prop_name
+        self.members = list(members) if members is not None else None
+        self.column = ArrayColumn(chunk)  # 每行 (K, M, ...).
+
+    def __call__(self, ensemble: Ensemble):
+        if self.members is None:
+            self.members = [i for i, obj in enumerate(ensemble.envs[0].children) if hasattr(obj, self.prop_name)]
+        objs = [[env.children[i] for i in self.members] for env in ensemble.envs]
+        if self.prop_name in ('pos', 'vel') and all(
+                isinstance(obj, MoveEntity) and obj._block is not None for row in objs for obj in row):
+            blocks = {id(obj._block) for row in objs for obj in row}
+            if len(blocks) == 1:
+                block = objs[0][0]._block
+                slots = np.asarray([[obj._slot for obj in row] for row in objs], dtype=np.int64)
+                self.column.append(ensemble.time_info[0], getattr(block, self.prop_name)[slots])
+                return
+        value = [[getattr(obj, self.prop_name) for obj in row] for row in objs]
+        self.column.append(ensemble.time_info[0], value)
+
+    @property
+    def records(self):
+        values = self.column.values()
+        if values.ndim < 3:
+            return {}
+        return {j: np.moveaxis(values[:, :, m], 0, 1) for m, j in enumerate(self.members)}
+
+    @property
+    def times(self):
+        return self.column.times()
@@ -11,14 +11,26 @@ class EntityIdGen:
         EntityIdGen.__id += 1
         return EntityIdGen.__id
 
+    @staticmethod
+    def current() -> int:
+        """ 最近生成的 ID. """
+        return EntityIdGen.__id
+
+    @staticmethod
+    def ensure(last: int):
+        """ 保证之后生成的 ID 大于 last（用于恢复检查点）. """
+        EntityIdGen.__id = max(EntityIdGen.__id, int(last))
+
 
 class Entity:
     """ 实体. """
 
     def __init__(self, **kwargs):
         self.__id = EntityIdGen.gen()
-        self.name = ''  # str
         self.env = None  # 环境
+        self._name = ''  # str
+        self.interaction_radius = None  # 交互半径，None 表示与所有实体交互.
+        self.update_period = None  # 更新周期 (s)，None 表示每步更新.
         self._copy_props = []  # deepcopy 属性.
         self._set_params(**kwargs)
 
@@ -27,6 +39,10 @@ class Entity:
             self._add_props(kwargs['props'])
         if 'name' in kwargs:
             self.name = str(kwargs['name'])
+        if 'interaction_radius' in kwargs and kwargs['interaction_radius'] is not None:
+            self.interaction_radius = float(kwargs['interaction_radius'])
+        if 'update_period' in kwargs and kwargs['update_period'] is not None:
+            self.update_period = float(kwargs['update_period'])
 
     def _add_props(self, props):
         """ 支持动态属性. """
@@ -48,11 +64,61 @@ class Entity:
                 setattr(obj, name, v)
         return obj
 
+    def _snapshot(self, snap=None):
+        """ 生成交互阶段快照，语义与 deepcopy 一致.
+
+        :param snap: 上一步的快照对象. 传入时复用该对象，避免重新分配.
+        :return: 快照对象.
+        """
+        if snap is None:
+            return copy.deepcopy(self)
+        snap.__dict__.update(self.__dict__)
+        for name in self._copy_props:
+            if hasattr(self, name):
+                setattr(snap, name, copy.deepcopy(getattr(self, name)))
+        return snap
+
+    def has_access(self) -> bool:
+        """ access 是否有实际动作. 无动作的实体在交互阶段不被调用. """
+        return type(self).access is not Entity.access
+
+    def has_step(self) -> bool:
+        """ step 是否有实际动作. 无动作的实体在步进阶段不被调用. """
+        return type(self).step is not Entity.step
+
+    def access_types(self) -> Optional[tuple]:
+        """ access 关心的交互对象类型. 环境每步按类型分桶一次，只传入这些类型的实体. None 表示全部. """
+        return None
+
+    def is_passive(self) -> bool:
+        """ access 是否不会改变自身状态. 被动实体在交互阶段无需快照. """
+        return type(self).access is Entity.access
+
+    @property
+    def name(self) -> str:
+        """ 名称. 加入环境后修改时同步更新环境的名称索引. """
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        self._name = value
+        env = getattr(self, 'env', None)  # 子类可能在 Entity.__init__ 之前设置名称.
+        if env is not None:
+            env._reindex(self)
+
     @property
     def id(self) -> int:
         """ 实体唯一标识号. """
         return self.__id
 
+    def _attach(self, env):
+        """ 加入环境时由环境调用. """
+        self.env = env
+
+    def _detach(self):
+        """ 移出环境时由环境调用. """
+        self.env = None
+
     def reset(self):
         pass
 
@@ -62,5 +128,16 @@ class Entity:
     def access(self, others):
         pass
 
+    def wake_time(self, time_info) -> Optional[float]:
+        """ 下次需要处理的时间（事件推进模式使用）.
+
+        默认：有交互或步进动作的实体每步都需要处理；否则返回 None（空闲）.
+        空闲实体应能以一次大步长 step 正确补齐跳过的时间.
+        """
+        now, dt = time_info
+        if self.has_access() or type(self).step is not Entity.step:
+            return now + dt
+        return None
+
     def is_alive(self) -> bool:
         return True
@@ -1,7 +1,13 @@
 import copy
+import heapq
+import random
 
 from typing import Optional, Tuple, List
 from .entity import Entity
+from .store import StateStore
+from .spatial import GridIndex, position_of
+from .instrument import StepProfiler
+from .realtime import Pacer
 
 
 class _SimClock:
@@ -12,7 +18,10 @@ class _SimClock:
         self._stop = 10.
         self._step = 0.1
         self._now = self._start
+        self._ticks = 0  # 已推进步数.
         self._realtime = False
+        self._speed = 1.0  # 实时模式速度倍率.
+        self._overrun = 'catchup'  # 实时模式超时处理方式.
 
     def set_params(self, **kwargs):
         if 'start' in kwargs:
@@ -23,6 +32,10 @@ class _SimClock:
             self._step = float(kwargs['step'])
         if 'realtime' in kwargs:
             self._realtime = bool(kwargs['realtime'])
+        if 'speed' in kwargs and float(kwargs['speed']) > 0:
+            self._speed = float(kwargs['speed'])
+        if 'overrun' in kwargs and kwargs['overrun'] in ('catchup', 'skip'):
+            self._overrun = kwargs['overrun']
         self.reset()
 
     def time_info(self) -> Tuple[float, float]:
@@ -33,14 +46,39 @@ class _SimClock:
         """ 当前时钟信息 (now, step)."""
         return self._start, self._stop, self._step
 
+    def pacer(self) -> Optional[Pacer]:
+        """ 实时模式节拍器. 非实时模式返回 None. """
+        return Pacer(self._speed, self._overrun) if self._realtime else None
+
+    @property
+    def ticks(self) -> int:
+        """ 自起始时间以来推进的步数. """
+        return self._ticks
+
     def reset(self):
         self._now = self._start
+        self._ticks = 0
 
     def is_over(self) -> bool:
         return self._now > self._stop
 
     def step(self):
         self._now += self._step
+        self._ticks += 1
+
+    def advance_to(self, t) -> float:
+        """ 按整步前进至不早于 t 的第一个步点，但不越过最后一个不超过 stop 的步点.
+
+        至少前进一步. 逐步累加，保证步点与固定步长推进完全一致.
+
+        :param t: 目标时间.
+        :return: 实际前进的时长.
+        """
+        start = self._now
+        self.step()
+        while self._now < t and self._now + self._step <= self._stop:
+            self.step()
+        return self._now - start
 
 
 class Environment:
@@ -49,14 +87,73 @@ class Environment:
     Properties:
         step_events: 场景步进事件列表.
             调用方式 event_handler(env)
+            定时事件（如 EventScheduler）提供 next_time(env)/is_due(env) 接口，
+            由环境按到期时间排队，只在到期时调用.
+
+    Params:
+        cell: 空间索引网格边长. 默认取实体最大交互半径.
+        seed: 环境随机数种子. 未指定时 env.random 为全局 random 模块.
+        snapshot: 交互阶段快照方式.
+            'cow': 默认. 写时拷贝，仅在实体自身 access 前为其生成快照，被动实体不拷贝，
+                快照对象跨步复用. others 应视为只读，且仅在当步交互阶段有效.
+            'copy': 每步深拷贝全部实体.
+        profile: 是否开启步进计时统计，结果见 env.profiler.
+        realtime: 是否按墙钟实时运行. 节拍统计见 env.pacer.
+        speed: 实时模式速度倍率（仿真秒/墙钟秒）.
+        overrun: 实时模式步进超时处理方式. 'catchup' 追赶；'skip' 放弃错过的时间. 参见 Pacer.
+        advance: 时钟推进方式.
+            'fixed': 默认. 固定步长逐步推进.
+            'event': 事件推进. 每步结束后取实体 wake_time 与定时事件到期时间的最早者，
+                时钟直接跳到该时间所在步点；跳过的时间以一次大步长调用实体 step 补齐.
+                定时事件触发后的下一步总是正常处理. 普通步进事件只在实际处理的步点调用.
+
+    实体可通过 update_period 声明更新周期（取整为基本步长的 k 倍）. 环境按周期分组，
+    每组只在步数为 k 的整数倍时调用 access/step，step 的 dt 为该组上次更新以来的时长；
+    未到期的组不被遍历，但仍作为其他实体的交互对象.
     """
 
     def __init__(self):
         self._children = []  # List[Entity]
+        self._ids = {}  # id -> Entity
+        self._names = {}  # name -> List[Entity]，按加入顺序.
+        self._id_names = {}  # id -> 建立索引时的名称.
         self._clock = _SimClock()
         self._step_events = []
+        self._store = StateStore()  # 运动实体状态存储.
+        self._cell = None  # 空间索引网格边长.
+        self._snapshot = 'cow'  # 交互阶段快照方式.
+        self._snapshots = {}  # id -> 复用的快照对象.
+        self._random = None  # 随机数发生器（EventScheduler 等使用）.
+        self._events = None  # 已排队的 step_events.
+        self._plain_events = []  # [(序号, 事件)] 每步调用的事件.
+        self._event_queue = []  # [(到期时间, 序号, 事件)] 定时事件堆.
+        self.profiler = None  # 步进计时统计 (StepProfiler).
+        self._advance = 'fixed'  # 时钟推进方式.
+        self.pacer = None  # 实时节拍器 (Pacer)，最近一次实时运行.
+        self._members = 0  # 成员变化计数.
+        self._groups = None  # 更新周期分组，见 _due_groups.
+        self._groups_key = None  # 分组对应的 (成员变化计数, 基本步长).
+
+    def __getstate__(self):
+        # 快照缓存与事件队列为临时数据，恢复后重建.
+        state = self.__dict__.copy()
+        state['_snapshots'] = {}
+        state['_events'] = None
+        state['_plain_events'] = []
+        state['_event_queue'] = []
+        return state
 
     def set_params(self, **kwargs):
+        if 'cell' in kwargs:
+            self._cell = float(kwargs['cell']) if kwargs['cell'] else None
+        if 'seed' in kwargs and kwargs['seed'] is not None:
+            self._random = random.Random(kwargs['seed'])
+        if 'advance' in kwargs and kwargs['advance'] in ('fixed', 'event'):
+            self._advance = kwargs['advance']
+        if 'profile' in kwargs:
+            self.profiler = (self.profiler or StepProfiler()) if kwargs['profile'] else None
+        if 'snapshot' in kwargs and kwargs['snapshot'] in ('cow', 'copy'):
+            self._snapshot = kwargs['snapshot']
         self._clock.set_params(**kwargs)
 
     @property
@@ -67,6 +164,16 @@ class Environment:
     def children(self):
         return self._children
 
+    @property
+    def random(self):
+        """ 随机数发生器. 未设置种子时为全局 random 模块. """
+        return self._random if self._random is not None else random
+
+    @property
+    def store(self) -> StateStore:
+        """ 运动实体状态存储. """
+        return self._store
+
     @property
     def clock_info(self) -> Tuple[float, float, float]:
         return self._clock.info()
@@ -76,65 +183,328 @@ class Environment:
         """ 仿真场景时间信息 (now, step). """
         return self._clock.time_info()
 
+    @property
+    def members_version(self) -> int:
+        """ 成员变化计数. 实体增删、迁移状态存储或调用 touch 时增加，可用于判断按成员建立的缓存是否失效. """
+        return self._members
+
+    @property
+    def ticks(self) -> int:
+        """ 本次运行已推进的基本步数. """
+        return self._clock.ticks
+
     def add(self, obj: Entity) -> Optional[Entity]:
         """ 增加实体. """
         if obj and isinstance(obj, Entity):
-            if not self.find(obj):
+            if obj.id not in self._ids:
                 self._children.append(obj)
-                obj.env = self
+                self._members += 1
+                self._index(obj)
+                obj._attach(self)
             return obj
         return None
 
+    def add_many(self, objs) -> List[Entity]:
+        """ 批量增加实体.
+
+        :param objs: 实体序列.
+        :return: 新加入的实体列表.
+        """
+        added = []
+        for obj in objs:
+            if isinstance(obj, Entity) and obj.id not in self._ids:
+                self._index(obj)
+                added.append(obj)
+        self._children.extend(added)
+        self._members += 1
+        for obj in added:
+            obj._attach(self)
+        return added
+
+    def share_store(self, store: StateStore):
+        """ 改用指定（可由多个环境共享）的状态存储，已加入的实体迁移到新存储. """
+        objs = list(self._children)
+        for obj in objs:
+            obj._detach()
+        self._store = store
+        for obj in objs:
+            obj._attach(self)
+        self._members += 1
+        self._snapshots.clear()
+
     def remove(self, tag):
         """ 移除实体. """
         if obj := self.find(tag):
-            obj.env = None
+            obj._detach()
             self._children.remove(obj)
+            self._members += 1
+            self._unindex(obj)
+            self._snapshots.pop(obj.id, None)
 
     def find(self, tag) -> Optional[Entity]:
         """ 查找实体.
 
+        名称在实体加入环境时建立索引.
+
         :param tag: 对象标识. 可以是 Entity， id， name.
         :return: 返回环境中找到的对象.
         """
-        for obj in self._children:
-            if isinstance(tag, Entity) and tag is obj:
-                return obj
-            if isinstance(tag, int) and tag == obj.id:
-                return obj
-            if isinstance(tag, str) and tag == obj.name and tag != '':
-                return obj
+        if isinstance(tag, Entity):
+            return tag if self._ids.get(tag.id) is tag else None
+        if isinstance(tag, int):
+            return self._ids.get(tag)
+        if isinstance(tag, str) and tag != '':
+            objs = self._names.get(tag)
+            return objs[0] if objs else None
         return None
 
+    def _index(self, obj: Entity):
+        self._ids[obj.id] = obj
+        if obj.name != '':
+            self._names.setdefault(obj.name, []).append(obj)
+            self._id_names[obj.id] = obj.name
+
+    def _reindex(self, obj: Entity):
+        """ 实体名称变化后更新名称索引. """
+        if self._ids.get(obj.id) is obj:
+            self._unindex(obj)
+            self._index(obj)
+
+    def _unindex(self, obj: Entity):
+        self._ids.pop(obj.id, None)
+        name = self._id_names.pop(obj.id, None)
+        if name is not None:
+            objs = self._names[name]
+            objs.remove(obj)
+            if not objs:
+                self._names.pop(name)
+
     def run(self, **kwargs):
         """ 运行. """
         self.set_params(**kwargs)
         self.reset()
+        self.pacer = self._clock.pacer()
+        if self.pacer is None:
+            while not self.is_over():
+                self.step()
+            return
+
+        self.pacer.start(self.time_info[0])
         while not self.is_over():
+            self.pacer.wait(self.time_info[0])
             self.step()
+        self.pacer.finish()
 
     def step(self):
         """ 步进. """
         assert not self.is_over()
+        t = self._update()
+        self._store.integrate(self.time_info[1])
+        self._finish(t)
 
-        # 相互交互.
-        children = [obj for obj in self.children if obj.is_alive()]
-        children_copy = copy.deepcopy(children)
-        for obj in children:
-            others = [e for e in children_copy if e.id != obj.id]
-            obj.access(others)
+    def _update(self) -> float:
+        """ 步进前半段：相互交互与实体步进. 返回计时点（用于步进计时统计）. """
+        prof = self.profiler
+        t = prof.clock() if prof is not None else 0.0
+        now, step = self.time_info
+        groups = self._due_groups()
+
+        # 相互交互. 只遍历有交互或步进动作的实体，其余实体（如由状态存储统一积分的运动实体）只作为交互对象.
+        actors = [obj for obj in self._due(groups) if obj.has_access()]
+        if actors:
+            children = [obj for obj in self.children if obj.is_alive()]
+            order = {obj.id: i for i, obj in enumerate(children)}
+            buckets = {}  # 交互对象类型 -> 序号列表，每步按需建立一次.
+            if self._snapshot == 'copy':
+                view = copy.deepcopy(children)
+                index = self._spatial_index(view)
+                for obj in actors:
+                    self._access(obj, self._others(view[order[obj.id]], view, index, buckets), prof)
+            else:
+                view = list(children)
+                index = self._spatial_index(view)
+                for obj in actors:
+                    i = order[obj.id]
+                    if not obj.is_passive():
+                        view[i] = self._freeze(obj)
+                    self._access(obj, self._others(view[i], view, index, buckets), prof)
+        if prof is not None:
+            t = prof.lap('access', t)
 
         # 实体步进
-        children = [obj for obj in self.children if obj.is_alive()]
-        for obj in children:
-            obj.step(self.time_info)
+        for group in groups:
+            k, _, covered, objs, _ = group
+            time_info = (now, step) if k == 1 else (now, now + step - covered)
+            group[2] = now + step
+            for obj in [obj for obj in objs if obj.is_alive()]:
+                if prof is None:
+                    obj.step(time_info)
+                else:
+                    prof.call('step', obj, obj.step, time_info)
+        if prof is not None:
+            t = prof.lap('step', t)
+        return t
+
+    def _finish(self, t: float):
+        """ 步进后半段（状态存储积分之后）：处理事件与时钟步进. """
+        prof = self.profiler
+        if prof is not None:
+            t = prof.lap('integrate', t)
 
         # 处理事件.
-        for evt in self.step_events:
-            evt(self)
+        fired = self._process_events()
+        if prof is not None:
+            prof.lap('events', t)
 
         # 时钟步进.
-        self._clock.step()
+        if self._advance == 'event' and not fired:
+            self._advance_idle()
+        else:
+            self._clock.step()
+
+    def _due_groups(self) -> list:
+        """ 本步到期的更新周期分组. 成员或步长变化时重新分组.
+
+        分组 [k, 成员, 已更新至时间, 需要步进的成员, 有交互或步进动作的成员 [(加入序号, 实体)]].
+        """
+        now, step = self.time_info
+        if self._groups_key != (self._members, step):
+            covered = {g[0]: g[2] for g in self._groups} if self._groups else {}
+            groups = {}
+            for i, obj in enumerate(self._children):
+                k = 1 if obj.update_period is None else max(1, int(round(obj.update_period / step)))
+                groups.setdefault(k, []).append((i, obj))
+            self._groups = [[k, [obj for _, obj in groups[k]], covered.get(k, now),
+                             [obj for _, obj in groups[k] if obj.has_step()],
+                             [(i, obj) for i, obj in groups[k] if obj.has_step() or obj.has_access()]]
+                            for k in sorted(groups)]
+            self._groups_key = (self._members, step)
+        ticks = self._clock.ticks
+        return [g for g in self._groups if ticks % g[0] == 0]
+
+    @staticmethod
+    def _due(groups) -> List[Entity]:
+        """ 本步到期、有交互或步进动作的活动实体（按加入顺序）. 只遍历到期分组. """
+        if len(groups) == 1:
+            return [obj for _, obj in groups[0][4] if obj.is_alive()]
+        workers = heapq.merge(*[g[4] for g in groups], key=lambda x: x[0])
+        return [obj for _, obj in workers if obj.is_alive()]
+
+    def touch(self):
+        """ 通知环境实体的交互或步进行为已变化（如设置了运动策略），下一步重新分组. """
+        self._members += 1
+
+    def wake_time(self) -> Optional[float]:
+        """ 下一个需要处理的时间：实体 wake_time 与定时事件到期时间的最早者. None 表示没有. """
+        time_info = self.time_info
+        times = [t for t in (obj.wake_time(time_info) for obj in self.children if obj.is_alive()) if t is not None]
+        if self._event_queue:
+            times.append(self._event_queue[0][0])
+        return min(times) if times else None
+
+    def _advance_idle(self):
+        """ 事件推进：跳到下一个需要处理的步点，并补齐跳过的时间. """
+        _, step = self.time_info
+        wake = self.wake_time()
+        gap = self._clock.advance_to(wake if wake is not None else float('inf')) - step
+        if gap > 0.0:
+            now, _ = self.time_info
+            for group in self._groups:
+                _, _, covered, objs, _ = group
+                time_info = (covered, now - covered)
+                group[2] = now
+                for obj in [obj for obj in objs if obj.is_alive()]:
+                    obj.step(time_info)
+            self._store.integrate(gap)
+
+    @staticmethod
+    def _access(obj, others, prof):
+        if prof is None:
+            obj.access(others)
+        else:
+            prof.call('access', obj, obj.access, others)
+
+    def _fire(self, evt):
+        if self.profiler is None:
+            evt(self)
+        else:
+            self.profiler.call_event(evt, self)
+
+    def _process_events(self) -> bool:
+        """ 按 step_events 顺序调用普通事件和到期的定时事件. 返回是否有定时事件触发. """
+        events = tuple(self._step_events)
+        if events != self._events:
+            self._schedule_events(events)
+        if not self._event_queue or self._event_queue[0][0] > self.time_info[0]:
+            for _, evt in self._plain_events:
+                self._fire(evt)
+            return False
+
+        now, _ = self.time_info
+        due = []
+        while self._event_queue and self._event_queue[0][0] <= now:
+            _, i, evt = heapq.heappop(self._event_queue)
+            if evt.is_due(self):
+                due.append((i, evt))
+        for _, evt in sorted(self._plain_events + due, key=lambda x: x[0]):
+            self._fire(evt)
+        for i, evt in due:
+            self._push_event(i, evt)
+        return bool(due)
+
+    def _schedule_events(self, events):
+        """ 重建事件队列. """
+        self._events = events
+        self._plain_events = []
+        self._event_queue = []
+        for i, evt in enumerate(events):
+            if callable(getattr(evt, 'next_time', None)):
+                self._push_event(i, evt)
+            else:
+                self._plain_events.append((i, evt))
+
+    def _push_event(self, i, evt):
+        t = evt.next_time(self)
+        if t is not None:
+            heapq.heappush(self._event_queue, (t, i, evt))
+
+    def _freeze(self, obj: Entity) -> Entity:
+        """ 生成（复用）实体快照. """
+        snap = obj._snapshot(self._snapshots.get(obj.id))
+        self._snapshots[obj.id] = snap
+        return snap
+
+    def _spatial_index(self, objs) -> Optional[GridIndex]:
+        """ 构建空间索引. 没有实体声明交互半径时返回 None. """
+        radius = [obj.interaction_radius for obj in objs if obj.interaction_radius is not None]
+        if not radius:
+            return None
+        cell = self._cell or max(radius)
+        index = GridIndex(cell if cell > 0.0 else 1.0)
+        index.build(objs)
+        return index
+
+    @staticmethod
+    def _others(obj, objs, index: Optional[GridIndex], buckets: Optional[dict] = None) -> List[Entity]:
+        """ 获取实体的交互对象.
+
+        :param buckets: 按交互对象类型 (access_types) 分桶的序号缓存，同一步内共享.
+        """
+        types = obj.access_types()
+        center = position_of(obj) if index is not None and obj.interaction_radius is not None else None
+        if center is not None:
+            idx = index.query(center, obj.interaction_radius).tolist()
+            if types is not None:
+                idx = [i for i in idx if isinstance(objs[i], types)]
+        elif types is not None:
+            if buckets is None:
+                buckets = {}
+            if types not in buckets:
+                buckets[types] = [i for i, e in enumerate(objs) if isinstance(e, types)]
+            idx = buckets[types]
+        else:
+            return [e for e in objs if e.id != obj.id]
+        return [objs[i] for i in idx if objs[i].id != obj.id]
 
     def is_over(self) -> bool:
         """ 判断是否结束. """
@@ -142,5 +512,8 @@ class Environment:
 
     def reset(self):
         self._clock.reset()
+        self._events = None
+        self._groups = None
+        self._groups_key = None
         for obj in self._children:
             obj.reset()
@@ -0,0 +1,94 @@
+"""
+步进计时统计：按阶段、实体类型和步进事件统计耗时与调用次数.
+"""
+
+import json
+import time
+from functools import partial
+from typing import List, Optional
+
+
+def event_name(evt) -> str:
+    """ 步进事件名称. """
+    if isinstance(evt, partial):
+        return event_name(evt.func)
+    if hasattr(evt, 'evt') and hasattr(evt, 'next_time'):
+        return f'{type(evt).__name__}({event_name(evt.evt)})'
+    if hasattr(evt, '__qualname__'):
+        return evt.__qualname__
+    return type(evt).__name__
+
+
+class StepProfiler:
+    """ 步进计时统计.
+
+    由 Environment 在开启时调用（env.set_params(profile=True)），未开启时环境不产生额外开销.
+
+    统计键为 (kind, phase, name):
+        ('phase', 阶段, ''): 阶段整体耗时. 阶段为 access/step/integrate/events.
+        ('entity', 阶段, 实体类名): 某类实体在 access/step 阶段的耗时.
+        ('event', 'events', 事件名): 步进事件耗时.
+    """
+
+    def __init__(self):
+        self._stats = {}  # (kind, phase, name) -> [count, total]
+
+    @staticmethod
+    def clock() -> float:
+        return time.perf_counter()
+
+    def add(self, kind: str, phase: str, name: str, dt: float):
+        """ 累加一次计时. """
+        stat = self._stats.get((kind, phase, name))
+        if stat is None:
+            self._stats[(kind, phase, name)] = [1, dt]
+        else:
+            stat[0] += 1
+            stat[1] += dt
+
+    def lap(self, phase: str, t0: float) -> float:
+        """ 记录阶段耗时，返回当前时刻. """
+        now = time.perf_counter()
+        self.add('phase', phase, '', now - t0)
+        return now
+
+    def call(self, phase: str, obj, fun, arg):
+        """ 调用实体方法并计时. """
+        t0 = time.perf_counter()
+        try:
+            return fun(arg)
+        finally:
+            self.add('entity', phase, type(obj).__name__, time.perf_counter() - t0)
+
+    def call_event(self, evt, env):
+        """ 调用步进事件并计时. """
+        t0 = time.perf_counter()
+        try:
+            return evt(env)
+        finally:
+            self.add('event', 'events', event_name(evt), time.perf_counter() - t0)
+
+    def reset(self):
+        self._stats.clear()
+
+    def report(self, kind: Optional[str] = None, phase: Optional[str] = None) -> List[dict]:
+        """ 统计报告，按总耗时降序.
+
+        :param kind: 只返回该类统计. 'phase', 'entity', 'event'.
+        :param phase: 只返回该阶段统计.
+        :return: [{'kind', 'phase', 'name', 'count', 'total', 'mean'}].
+        """
+        ret = []
+        for (k, p, name), (count, total) in self._stats.items():
+            if (kind is None or k == kind) and (phase is None or p == phase):
+                ret.append({'kind': k, 'phase': p, 'name': name, 'count': count,
+                            'total': total, 'mean': total / count})
+        return sorted(ret, key=lambda r: r['total'], reverse=True)
+
+    def to_json(self, path=None, **kwargs) -> str:
+        """ 报告转换为 JSON；指定 path 时同时写入文件. """
+        text = json.dumps(self.report(**kwargs), indent=2)
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(text)
+        return text
@@ -0,0 +1,145 @@
+"""
+成对作用力：以数组运算一次计算所有成员间的作用，更新成员速度（用于多体、斥力、群体分离等）.
+
+Usages:
+    env.add(PairwiseForce(gravity(G=1.0e3)))  # 环境中所有运动实体相互引力.
+    env.add(PairwiseForce(separation(radius=5.0, k=2.0), members=uavs, cutoff=5.0))
+"""
+
+from typing import Callable, Optional
+import numpy as np
+from .entity import Entity
+from .move import MoveEntity
+
+
+##############################################################################
+# 作用力规律.
+# law(r, mi, mj) -> 成员 i 受 j 作用产生的加速度大小（数组）. 正值指向 j（吸引），负值背离 j（排斥）.
+##############################################################################
+
+
+def gravity(G=1.0):
+    """ 引力: G * mj / r^2. """
+    def law(r, mi, mj):
+        return G * mj / (r * r)
+    return law
+
+
+def repulsion(k=1.0, p=2.0):
+    """ 斥力: -k * mj / r^p. """
+    def law(r, mi, mj):
+        return -k * mj / r ** p
+    return law
+
+
+def separation(radius, k=1.0):
+    """ 群体分离: 距离小于 radius 时 -k * (radius - r) / radius，否则为 0. """
+    def law(r, mi, mj):
+        return -k * np.clip(radius - r, 0.0, None) / radius
+    return law
+
+
+class PairwiseForce(Entity):
+    """ 成对作用力.
+
+    在交互阶段读取成员在状态存储中的位置，计算全部成对加速度，按 vel += a * dt 更新成员速度.
+    成员须为已加入环境、维度相同且由状态存储积分的 MoveEntity（重写 step 的子类自行积分，不使用状态存储，
+    不能作为成员）. 质量在成员变化时读取一次.
+    """
+
+    def __init__(self, law: Callable, members=None, cutoff: Optional[float] = None, mass='m', chunk=1024, **kwargs):
+        """ 初始化.
+
+        :param law: 作用力规律 law(r, mi, mj).
+        :param members: 成员列表. 不在环境中的成员被忽略；在环境中但不使用状态存储的成员报错.
+            默认为环境中全部已加入状态存储的 MoveEntity.
+        :param cutoff: 截断距离. 指定时只计算距离不超过 cutoff 的成对作用（按网格分块）.
+        :param mass: 质量属性名. 缺少该属性的成员质量为 1.
+        :param chunk: 无截断时每次计算的行数（限制 N×N 中间数组的内存）.
+        """
+        super().__init__(**kwargs)
+        self.law = law
+        self.members = list(members) if members is not None else None
+        self.cutoff = cutoff
+        self.mass = mass
+        self.chunk = max(int(chunk), 1)
+        self.batched = False  # 是否由集合运行 (Ensemble) 跨副本批量计算.
+        self._key = None  # 成员缓存对应的环境成员变化计数.
+        self._block = None
+        self._slots = None
+        self._masses = None
+
+    def is_passive(self) -> bool:
+        return True
+
+    def has_access(self) -> bool:
+        return not self.batched
+
+    def access(self, others):
+        if self.batched or not self._update_members():
+            return
+        _, dt = self.env.time_info
+        pos = self._block.pos[self._slots]
+        acc = self.accelerations(pos, self._masses)
+        self._block.vel[self._slots] += acc * dt
+
+    def accelerations(self, pos, masses) -> np.ndarray:
+        """ 计算全部成员加速度.
+
+        :param pos: 位置 (N, D)，或 K 个副本的位置 (K, N, D)（副本之间无作用）.
+        :param masses: 质量 (N,) 或 (K, N).
+        :return: 加速度，形状同 pos.
+        """
+        acc = np.zeros_like(pos)
+        n = pos.shape[-2]
+        if self.cutoff is None:
+            rows_per_chunk = max(self.chunk // (len(pos) if pos.ndim == 3 else 1), 1)
+            for s in range(0, n, rows_per_chunk):
+                rows = np.arange(s, min(s + rows_per_chunk, n))
+                acc[..., rows, :] = self._pair_acc(pos, masses, rows, np.arange(n))
+        elif pos.ndim == 3:
+            for k in range(len(pos)):
+                acc[k] = self.accelerations(pos[k], masses[k])
+        else:
+            keys = np.floor(pos / self.cutoff).astype(np.int64)
+            cells = {}
+            for i, k in enumerate(map(tuple, keys.tolist())):
+                cells.setdefault(k, []).append(i)
+            cells = {k: np.asarray(v) for k, v in cells.items()}
+            offsets = np.stack(np.meshgrid(*[[-1, 0, 1]] * pos.shape[1], indexing='ij'), -1).reshape(-1, pos.shape[1])
+            for k, rows in cells.items():
+                cols = [cells.get(tuple((np.asarray(k) + o).tolist())) for o in offsets]
+                cols = np.concatenate([c for c in cols if c is not None])
+                acc[rows] = self._pair_acc(pos, masses, rows, cols)
+        return acc
+
+    def _pair_acc(self, pos, masses, rows, cols):
+        d = pos[..., None, cols, :] - pos[..., rows, None, :]  # (..., R, C, D) 指向 j.
+        r = np.linalg.norm(d, axis=-1)
+        valid = r > 0.0
+        if self.cutoff is not None:
+            valid &= r <= self.cutoff
+        rs = np.where(valid, r, 1.0)
+        f = np.where(valid, self.law(rs, masses[..., rows, None], masses[..., None, cols]), 0.0)
+        return np.einsum('...rc,...rcd->...rd', f / rs, d)
+
+    def _update_members(self) -> bool:
+        """ 成员变化时重建成员行号与质量. 返回是否有可计算的成员. """
+        key = (self.env.members_version, len(self.members) if self.members is not None else None)
+        if key != self._key:
+            self._key = key
+            if self.members is not None:
+                objs = [obj for obj in self.members if obj.env is not None]
+                for obj in objs:
+                    if not isinstance(obj, MoveEntity) or obj._block is None:
+                        raise ValueError(f'PairwiseForce member {obj.name or obj.id} is not integrated by the '
+                                         f'state store (not a MoveEntity, or it overrides step)')
+            else:
+                objs = [obj for obj in self.env.children if isinstance(obj, MoveEntity) and obj._block is not None]
+            blocks = {id(obj._block) for obj in objs}
+            if len(blocks) > 1:
+                raise ValueError('PairwiseForce members must have the same dimension')
+            self._block = objs[0]._block if objs else None
+            self._slots = np.asarray([obj._slot for obj in objs], dtype=np.int64)
+            self._masses = np.asarray([float(getattr(obj, self.mass, 1.0)) for obj in objs])
+        return self._block is not None and len(self._slots) > 1
@@ -0,0 +1,67 @@
+"""
+蒙特卡洛运行：在进程池中并行运行同一场景的多个随机副本.
+
+Usages:
+    def build(seed):  # 模块级函数，需可被 pickle.
+        env = Environment()
+        ...
+        return env
+
+    results = run_replicas(build, seeds=range(100), stop=100.0)
+"""
+
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, List, Optional
+import numpy as np
+from . import Environment
+
+
+def collect_records(env: Environment) -> list:
+    """ 默认结果收集：返回 step_events 中所有记录器的 records. """
+    return [evt.records for evt in env.step_events if hasattr(evt, 'records')]
+
+
+def run_replica(factory: Callable, seed: int, collect: Callable = collect_records, **kwargs):
+    """ 运行单个副本.
+
+    依次用 seed 设置全局 random、numpy.random 和环境随机数种子，再构建并运行场景.
+
+    :param factory: 场景构建函数 factory(seed) -> Environment.
+    :param seed: 副本随机数种子.
+    :param collect: 结果收集函数 collect(env) -> 结果.
+    :param kwargs: Environment.run 参数.
+    :return: 收集结果.
+    """
+    random.seed(seed)
+    np.random.seed(seed % 2 ** 32)
+    env = factory(seed)
+    env.run(seed=seed, **kwargs)
+    return collect(env)
+
+
+def _run_replica(args):
+    factory, seed, collect, kwargs = args
+    return run_replica(factory, seed, collect, **kwargs)
+
+
+def run_replicas(factory: Callable, seeds: Iterable[int], collect: Callable = collect_records,
+                 processes: Optional[int] = None, chunksize=1, **kwargs) -> List:
+    """ 在进程池中运行多个副本.
+
+    :param factory: 场景构建函数 factory(seed) -> Environment. 需为模块级函数.
+    :param seeds: 各副本随机数种子.
+    :param collect: 结果收集函数 collect(env) -> 结果. 需为模块级函数.
+        建议记录器采用列式存储，结果以数组形式回传.
+    :param processes: 进程数. 默认为 CPU 核数；为 1 时在当前进程中顺序运行.
+    :param chunksize: 每次分发给工作进程的副本数.
+    :param kwargs: Environment.run 参数. 不能包含 seed（各副本种子由 seeds 指定）.
+    :return: 按 seeds 顺序的结果列表.
+    """
+    if 'seed' in kwargs:
+        raise ValueError('replica seeds are given by "seeds"; do not pass "seed"')
+    tasks = [(factory, seed, collect, kwargs) for seed in seeds]
+    if processes == 1:
+        return [_run_replica(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(_run_replica, tasks, chunksize=chunksize))
@@ -1,4 +1,6 @@
+import bisect
 import copy
+import functools
 import math
 import numpy as np
 from sim import Entity
@@ -67,11 +69,72 @@ def xyz_to_aer_ex(xyz, origin, dir_, angle='d'):
     :param angle: 角度结果输出方式. 'd' 角度输出； 'r' 弧度输出.
     :return: 转换后 AER 坐标.
     """
-    pt = (xyz - origin) if dir_ is None else vec.trans(xyz - origin, mat_ae(dir_))
+    pt = (xyz - origin) if dir_ is None else vec.trans(xyz - origin, _mat_ae_cached(dir_[0], dir_[1]))
     aer = xyz_to_aer(pt, angle=angle)
     return aer
 
 
+def xyz_to_aer_batch(xyz, origin=None, angle='d'):
+    """ XYZ 转换至 AER 坐标（批量）.
+
+    :param xyz: 坐标数组 (N, 3).
+    :param origin: 坐标原点. (3,) 或 (N, 3).
+    :param angle: 角度结果输出方式. 'd' 角度输出； 'r' 弧度输出.
+    :return: 转换后 AER 坐标数组 (N, 3).
+    """
+    pt = np.asarray(xyz, dtype=np.float64)
+    assert pt.ndim == 2 and pt.shape[1] == 3
+    if origin is not None:
+        pt = pt - np.asarray(origin, dtype=np.float64)
+
+    x, y, z = pt[:, 0], pt[:, 1], pt[:, 2]
+    h = np.hypot(x, y)
+    ret = np.empty_like(pt)
+    a = np.arctan2(x, y, out=ret[:, 0])
+    a[a < 0] += 2 * math.pi
+    np.arctan2(z, h, out=ret[:, 1])
+    np.hypot(h, z, out=ret[:, 2])
+    if angle == 'd':
+        np.degrees(ret[:, :2], out=ret[:, :2])
+    return ret
+
+
+def aer_to_xyz_batch(aer, origin=None, angle='d'):
+    """ AER 转换至 XYZ 坐标（批量）.
+
+    :param aer: AER坐标数组 (N, 3).
+    :param origin: 坐标原点. (3,) 或 (N, 3).
+    :param angle: 角度结果输出方式. 'd' 角度输出； 'r' 弧度输出.
+    :return: 转换后 XYZ 坐标数组 (N, 3).
+    """
+    aer = np.asarray(aer, dtype=np.float64)
+    assert aer.ndim == 2 and aer.shape[1] == 3
+
+    a, e, r = aer[:, 0], aer[:, 1], aer[:, 2]
+    if angle == 'd':
+        a, e = np.radians(a), np.radians(e)
+    rc = r * np.cos(e)
+    pt = np.column_stack([rc * np.sin(a), rc * np.cos(a), r * np.sin(e)])
+    if origin is not None:
+        pt += np.asarray(origin, dtype=np.float64)
+    return pt
+
+
+def xyz_to_aer_ex_batch(xyz, origin, dir_, angle='d'):
+    """ XYZ 转换至 AER 坐标（批量）.
+
+    :param xyz: 坐标数组 (N, 3).
+    :param origin: 坐标原点. (3,) 或 (N, 3).
+    :param dir_: 坐标原点轴线方向.
+    :param angle: 角度结果输出方式. 'd' 角度输出； 'r' 弧度输出.
+    :return: 转换后 AER 坐标数组 (N, 3).
+    """
+    pt = np.asarray(xyz, dtype=np.float64) - np.asarray(origin, dtype=np.float64)
+    if dir_ is not None:
+        pt = pt @ _mat_ae_cached(dir_[0], dir_[1]).T
+    return xyz_to_aer_batch(pt, angle=angle)
+
+
 ##############################################################################
 # 辅助矩阵.
 ##############################################################################
@@ -122,6 +185,14 @@ def mat_ae(ae, type_='d'):
     return np.dot(mb, ma)
 
 
+@functools.lru_cache(maxsize=256)
+def _mat_ae_cached(a, e):
+    """ 缓存的方位/俯仰旋转矩阵（度）. 返回只读数组. """
+    m = mat_ae([a, e])
+    m.setflags(write=False)
+    return m
+
+
 def mat_a(a, type_='d'):
     """ 方位旋转矩阵（2维, 顺时针为正.）.
 
@@ -137,20 +208,27 @@ def mat_a(a, type_='d'):
 # 运动函数.
 ##############################################################################
 
-def move_to(pos, dest, d):
+def move_to(pos, dest, d, out=None):
     """ 向一个目标移动.
 
     :param pos: 当前位置.
     :param dest: 目标位置.
     :param d: 期望移动的距离.
+    :param out: 结果缓冲区. 指定时运动后位置写入 out（可与 pos 相同）.
     :return: (运动后位置, 剩余距离)
     """
     di = vec.dist(pos, dest)
+    if out is None:
+        out = np.array(pos, dtype=np.float64)
+    elif out is not pos:
+        np.copyto(out, pos)
     if di > d:
-        pos = copy.copy(pos) + vec.unit(dest - pos) * d
+        step = np.subtract(dest, out)
+        step *= d / di
+        out += step
     else:
-        pos = copy.copy(dest)
-    return pos, di - d
+        np.copyto(out, dest)
+    return out, di - d
 
 
 def in_range(val, rng, type_=''):
@@ -185,16 +263,59 @@ def in_range(val, rng, type_=''):
     return False
 
 
+def in_range_batch(vals, rng, type_=''):
+    """ 判断数值是否在规定范围内（批量）. 判断规则同 in_range.
+
+    :param vals: 数值数组.
+    :param rng: 范围.
+    :param type_: 判断类型. '': 默认，正常判断. 'a': 方位角（度）.  'e' 俯仰角（度）.
+    :return: 布尔数组.
+    """
+    vals = np.asarray(vals, dtype=np.float64)
+    if rng is None:
+        return np.ones(vals.shape, dtype=bool)
+    if type_ == '':
+        ret = np.ones(vals.shape, dtype=bool)
+        if rng[0] is not None:
+            ret &= rng[0] < vals
+        if rng[1] is not None:
+            ret &= vals < rng[1]
+        return ret
+    elif type_ == 'a':
+        vals = vals % 360
+        b0, b1 = rng[0] % 360, rng[1] % 360
+        if b1 >= b0:
+            return (b0 < vals) & (vals < b1)
+        else:
+            return (vals < b0) | (vals > b1)
+    elif type_ == 'e':
+        vals = (vals + 90) % 180 - 90
+        b0, b1 = (rng[0] + 90) % 180 - 90, (rng[1] + 90) % 180 - 90
+        return (b0 < vals) & (vals < b1)
+    return np.zeros(vals.shape, dtype=bool)
+
+
 ##############################################################################
 # 辅助类.
 ##############################################################################
 
 class Track:
-    """ 航线. """
+    """ 航线.
+
+    航点变化后首次使用时预计算航段长度、累积弧长和单位方向，按弧长求位置采用二分查找.
+    通过 set_params 增加航点或整体赋值 waypoints 时预计算自动失效；原地修改航点（如
+    track.waypoints[1] = p 或修改航点数组元素）后需调用 invalidate().
+    """
 
     def __init__(self, **kwargs):
-        self.waypoints = []
+        self._waypoints = []
         self.wp_index = 1
+        self._version = 0  # 航点修改计数.
+        self._key = None  # 预计算对应的 (航点修改计数, 航点数).
+        self._points = None  # 航点 (n, D).
+        self._arc = None  # 累积弧长 (n,).
+        self._arc_list = None  # 累积弧长（列表，用于标量二分查找）.
+        self._dirs = None  # 航段单位方向 (n - 1, D)，零长度航段为零向量.
         self.set_params(**kwargs)
 
     def set_params(self, **kwargs):
@@ -203,6 +324,21 @@ class Track:
                 self.waypoints.append(vec.vec(wp))
         if 'back' in kwargs and len(self.waypoints) > 0:
             self.waypoints.append(self.waypoints[0])
+        self.invalidate()
+
+    @property
+    def waypoints(self) -> list:
+        """ 航点列表. """
+        return self._waypoints
+
+    @waypoints.setter
+    def waypoints(self, value):
+        self._waypoints = list(value)
+        self.invalidate()
+
+    def invalidate(self):
+        """ 航点被原地修改后调用，使预计算的弧长与方向在下次使用时重建. """
+        self._version += 1
 
     def current_wp(self):
         """ 获取当前目标航点. """
@@ -225,50 +361,351 @@ class Track:
         """ 航线起始点. """
         return self.waypoints[0] if self.is_ok() else None
 
-
-def move_on_track(pos, track, dist):
-    """ 沿航路移动一定距离. """
-    left_dist = dist
-    while left_dist > 0.0:
-        wp = track.current_wp()
-        if wp is None:
-            break
-        d = vec.dist(wp, pos)
-        if d > left_dist:
-            pos += vec.unit(wp - pos) * left_dist
-            break
+    def _update(self):
+        key = (self._version, len(self.waypoints))
+        if self._key == key:
+            return
+        self._key = key
+        self._points = np.array(self.waypoints, dtype=np.float64)
+        diffs = np.diff(self._points, axis=0)
+        lengths = np.linalg.norm(diffs, axis=1)
+        self._arc = np.concatenate([[0.0], np.cumsum(lengths)])
+        self._arc_list = self._arc.tolist()
+        self._dirs = diffs / np.where(lengths > 0.0, lengths, 1.0)[:, None]
+
+    @property
+    def arc(self) -> np.ndarray:
+        """ 各航点处的累积弧长 (n,). """
+        self._update()
+        return self._arc
+
+    @property
+    def length(self) -> float:
+        """ 航线总长. """
+        return float(self.arc[-1]) if self.is_ok() else 0.0
+
+    def index_at(self, s: float) -> int:
+        """ 弧长 s 处的目标航点序号（恰在航点上时为下一航点）. 超出航线时为航点数. """
+        self._update()
+        return max(bisect.bisect_right(self._arc_list, s), 1)
+
+    def position_at(self, s: float, out=None) -> np.ndarray:
+        """ 弧长 s 处的位置. s 超出航线时取端点.
+
+        :param s: 弧长.
+        :param out: 结果缓冲区.
+        :return: 位置.
+        """
+        assert self.is_ok()
+        s = max(s, 0.0)
+        i = self.index_at(s)
+        if out is None:
+            out = np.empty(self._points.shape[1], dtype=np.float64)
+        if i >= len(self._arc_list):
+            np.copyto(out, self._points[-1])
         else:
-            pos = copy.copy(wp)
-            left_dist -= d
-            track.next_wp()
-    return pos
+            np.multiply(self._dirs[i - 1], s - self._arc_list[i - 1], out=out)
+            out += self._points[i - 1]
+        return out
+
+    def positions_at(self, s) -> np.ndarray:
+        """ 多个弧长处的位置（批量）.
+
+        :param s: 弧长数组 (M,).
+        :return: 位置 (M, D).
+        """
+        s = np.asarray(s, dtype=np.float64)
+        return TrackBatch([self] * len(s)).positions_at(s)[0]
+
+
+class TrackBatch:
+    """ 多条航线的合并索引：在一次数组运算中求多个对象沿各自航线的位置.
+
+    各航线的累积弧长错开后合并为一个有序数组，按弧长查找只需一次 searchsorted.
+    航线维度须相同；航线航点变化后需重新构建.
+    """
+
+    def __init__(self, tracks):
+        """ 初始化.
+
+        :param tracks: 航线列表（可重复）.
+        """
+        self.tracks = list(tracks)
+        uniq = {}
+        for t in self.tracks:
+            uniq.setdefault(id(t), t)
+        index = {k: i for i, k in enumerate(uniq)}
+        self._which = np.asarray([index[id(t)] for t in self.tracks], dtype=np.int64)  # 对象 -> 航线.
+        arcs, points, dirs, starts, base = [], [], [], [], 0.0
+        bases = []
+        for t in uniq.values():
+            arc = t.arc
+            starts.append(sum(len(a) for a in arcs))
+            bases.append(base)
+            arcs.append(arc)
+            points.append(t._points)
+            dirs.append(np.concatenate([t._dirs, np.zeros((1, t._points.shape[1]))]))
+            base += arc[-1] + 1.0  # 航线之间留出间隔，保证合并后严格分段.
+        self._bases = np.asarray(bases)
+        self._starts = np.asarray(starts, dtype=np.int64)
+        self._counts = np.asarray([len(a) for a in arcs], dtype=np.int64)
+        self._arc = np.concatenate(arcs)
+        self._keys = np.concatenate([a + b for a, b in zip(arcs, bases)])
+        self._points = np.concatenate(points)
+        self._dirs = np.concatenate(dirs)
+
+    @property
+    def counts(self) -> np.ndarray:
+        """ 各对象航线航点数 (M,). """
+        return self._counts[self._which]
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """ 各对象航线总长 (M,). """
+        return self._arc[self._starts + self._counts - 1][self._which]
+
+    def waypoints_at(self, index, members=None) -> np.ndarray:
+        """ 各对象航线第 index 个航点 (M', D). """
+        which = self._which if members is None else self._which[members]
+        return self._points[self._starts[which] + index]
+
+    def arc_at(self, index, members=None) -> np.ndarray:
+        """ 各对象航线第 index 个航点处的累积弧长 (M',). """
+        which = self._which if members is None else self._which[members]
+        return self._arc[self._starts[which] + index]
+
+    def positions_at(self, s, members=None):
+        """ 各对象沿航线弧长 s 处的位置和目标航点序号.
+
+        :param s: 弧长 (M',).
+        :param members: 对象序号 (M',). 默认为全部对象.
+        :return: (位置 (M', D), 目标航点序号 (M',)). 超出航线时位置取终点，序号为航点数.
+        """
+        s = np.asarray(s, dtype=np.float64)
+        which = self._which if members is None else self._which[members]
+        start, count = self._starts[which], self._counts[which]
+        s = np.clip(s, 0.0, None)
+        j = np.searchsorted(self._keys, self._bases[which] + s, side='right') - start
+        j = np.clip(j, 1, count)
+        # 合并数组的舍入可能使查找偏差一个航点，按局部弧长校正.
+        arc = self._arc
+        j = np.where((j > 1) & (s < arc[start + j - 1]), j - 1, j)
+        j = np.where((j < count) & (s >= arc[np.minimum(start + j, len(arc) - 1)]), j + 1, j)
+        seg = start + j - 1
+        pos = self._points[seg] + self._dirs[seg] * (s - arc[seg])[:, None]
+        over = j >= count
+        if over.any():
+            pos[over] = self._points[start[over] + count[over] - 1]
+        return pos, j
+
+
+def move_on_track(pos, track, dist, out=None):
+    """ 沿航路移动一定距离.
+
+    先直线移向当前目标航点；到达后按累积弧长二分查找终点所在航段.
+
+    :param pos: 当前位置.
+    :param track: 航线.
+    :param dist: 移动距离.
+    :param out: 结果缓冲区. 指定时运动后位置写入 out（可与 pos 相同）.
+    :return: 运动后位置.
+    """
+    if out is None:
+        out = np.array(pos, dtype=np.float64)
+    elif out is not pos:
+        np.copyto(out, pos)
+    if dist <= 0.0:
+        return out
+    wp = track.current_wp()
+    if wp is None:
+        return out
+    d = vec.dist(wp, out)
+    if d > dist:
+        move_to(out, wp, dist, out=out)
+        return out
+    s = track.arc[track.wp_index] + (dist - d)
+    track.wp_index = track.index_at(s)
+    track.position_at(s, out=out)
+    return out
+
+
+def move_to_batch(pos, dest, d, out=None):
+    """ 向目标移动（批量）. 规则同 move_to.
+
+    :param pos: 当前位置 (M, D).
+    :param dest: 目标位置 (M, D) 或 (D,).
+    :param d: 期望移动的距离 (M,) 或标量.
+    :param out: 结果缓冲区. 指定时运动后位置写入 out（可与 pos 相同）.
+    :return: (运动后位置 (M, D), 剩余距离 (M,))
+    """
+    pos = np.asarray(pos, dtype=np.float64)
+    if out is None:
+        out = pos.copy()
+    elif out is not pos:
+        np.copyto(out, pos)
+    diff = np.subtract(dest, pos)
+    di = np.linalg.norm(diff, axis=1)
+    d = np.broadcast_to(np.asarray(d, dtype=np.float64), di.shape)
+    far = di > d
+    out[far] += diff[far] * (d[far] / di[far])[:, None]
+    out[~far] = np.broadcast_to(dest, pos.shape)[~far]
+    return out, di - d
+
+
+def move_on_track_batch(pos, tracks: TrackBatch, wp_index, dist, members=None):
+    """ 沿航路移动一定距离（批量）. 规则同 move_on_track，目标航点序号由调用者保存.
+
+    :param pos: 当前位置 (M', D)，原地更新.
+    :param tracks: 航线合并索引.
+    :param wp_index: 当前目标航点序号 (M',).
+    :param dist: 移动距离 (M',) 或标量.
+    :param members: pos 各行对应的 tracks 对象序号 (M',). 默认为全部对象.
+    :return: 运动后的目标航点序号 (M',).
+    """
+    members = np.arange(len(tracks.tracks)) if members is None else np.asarray(members, dtype=np.int64)
+    wp_index = np.array(wp_index, dtype=np.int64)
+    dist = np.broadcast_to(np.asarray(dist, dtype=np.float64), wp_index.shape)
+    counts = tracks.counts[members]
+    active = (dist > 0.0) & (wp_index < counts)
+    if not active.any():
+        return wp_index
+    wp = tracks.waypoints_at(np.minimum(wp_index, counts - 1), members)
+    diff = wp - pos
+    d = np.linalg.norm(diff, axis=1)
+    far = active & (d > dist)
+    pos[far] += diff[far] * (dist[far] / d[far])[:, None]
+    reach = active & ~far
+    if reach.any():
+        s = tracks.arc_at(wp_index[reach], members[reach]) + (dist[reach] - d[reach])
+        pos[reach], wp_index[reach] = tracks.positions_at(s, members[reach])
+    return wp_index
+
+
+def _copy_into(buf, value):
+    """ 将 value 拷贝进缓冲区 buf（形状不符时重新分配）. """
+    if isinstance(buf, np.ndarray) and isinstance(value, np.ndarray) and buf.shape == value.shape:
+        np.copyto(buf, value)
+        return buf
+    return copy.deepcopy(value)
 
 
 class MoveEntity(Entity):
-    """ 运动对象. """
+    """ 运动对象.
+
+    加入环境后，pos/vel 存放在环境状态存储 (StateStore) 中，由环境统一积分；
+    未加入环境或重写了 step（自行积分）时使用自身数组.
+    """
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self._copy_props += ['pos', 'vel']
+        self._block, self._slot = None, None  # 状态存储行.
+        self._pos, self._vel = 0, 0
         self.pos0, self.vel0 = 0, 0
-        self.pos, self.vel = 0, 0
-        self.policy = None
+        self._policy = None  # 运动策略.
         self.set_params(**kwargs)
+        self.reset()
+
+    def __copy__(self):
+        """ 浅拷贝. 拷贝对象脱离状态存储，持有当前 pos/vel. """
+        obj = self.__class__.__new__(self.__class__)
+        obj.__dict__.update(self.__dict__)
+        if self._block is not None:
+            obj._pos, obj._vel = self.pos, self.vel
+            obj._block, obj._slot = None, None
+        return obj
+
+    def _snapshot(self, snap=None):
+        if snap is None or self._block is None or snap._block is not None:
+            return super()._snapshot(snap)
+        pos, vel = snap._pos, snap._vel
+        snap.__dict__.update(self.__dict__)
+        snap._block, snap._slot = None, None
+        snap._pos = _copy_into(pos, self.pos)
+        snap._vel = _copy_into(vel, self.vel)
+        return snap
+
+    def has_access(self) -> bool:
+        return type(self).access is not MoveEntity.access or self.policy is not None
+
+    def is_passive(self) -> bool:
+        return not self.has_access()
+
+    def has_step(self) -> bool:
+        # 状态存储中的匀速运动由环境统一积分.
+        return self._block is None
+
+    def wake_time(self, time_info):
+        # 无策略的匀速运动可以任意步长积分.
+        if not self.has_access() and type(self).step is MoveEntity.step:
+            return None
+        return super().wake_time(time_info)
+
+    @property
+    def policy(self):
+        """ 运动策略. 设置后通知环境重新判断是否需要交互. """
+        return self._policy
+
+    @policy.setter
+    def policy(self, value):
+        self._policy = value
+        if self.env is not None:
+            self.env.touch()
+
+    @property
+    def pos(self):
+        return self._pos if self._block is None else self._block.pos[self._slot]
+
+    @pos.setter
+    def pos(self, value):
+        if self._block is None:
+            self._pos = value
+        else:
+            self._block.pos[self._slot] = value
+
+    @property
+    def vel(self):
+        return self._vel if self._block is None else self._block.vel[self._slot]
+
+    @vel.setter
+    def vel(self, value):
+        if self._block is None:
+            self._vel = value
+        else:
+            self._block.vel[self._slot] = value
 
     def reset(self):
-        self.pos = self.pos0
-        self.vel = self.vel0
+        self.pos = copy.copy(self.pos0)
+        self.vel = copy.copy(self.vel0)
 
     def set_params(self, **kwargs):
         if 'pos' in kwargs:
-            self.pos0 = vec(kwargs['pos'])
+            self.pos0 = vec.vec(kwargs['pos'])
         if 'vel' in kwargs:
-            self.vel0 = vec(kwargs['vel'])
+            self.vel0 = vec.vec(kwargs['vel'])
         if 'policy' in kwargs:
             self.policy = kwargs['policy']
             self.policy.parent = self
 
+    def _attach(self, env):
+        super()._attach(env)
+        pos, vel = self.pos, self.vel
+        if isinstance(pos, np.ndarray) and pos.ndim == 1 and type(self).step is MoveEntity.step:
+            self._block = env.store.block(len(pos))
+            self._slot = self._block.alloc()
+            self.pos, self.vel = pos, vel
+
+    def _detach(self):
+        if self._block is not None:
+            pos, vel = self.pos.copy(), self.vel.copy()
+            self._block.release(self._slot)
+            self._block, self._slot = None, None
+            self._pos, self._vel = pos, vel
+        super()._detach()
+
     def step(self, time_info):
+        if self._block is not None:
+            return  # 由环境统一积分.
         _, dt = time_info
         self.pos += dt * self.vel
 
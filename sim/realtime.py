@@ -0,0 +1,88 @@
+"""
+实时节拍：按单调时钟控制仿真步进节奏.
+"""
+
+import time
+from typing import Optional
+import numpy as np
+
+
+class Pacer:
+    """ 实时节拍器.
+
+    每个步点的墙钟截止时间由起始锚点计算: wall0 + (t - t0) / speed，不累积 sleep 误差.
+    到达步点时若已超过截止时间，记为超时 (overrun)，处理方式:
+        'catchup': 后续步点不等待，连续运行直至追上计划时间.
+        'skip': 放弃已错过的时间，重新以当前时刻为锚点，之后仿真时间整体滞后.
+
+    Attributes:
+        lateness: 每步实际开始时刻相对截止时间的延迟 (s).
+        durations: 每步处理耗时 (s).
+        overruns: 超时步数.
+    """
+
+    def __init__(self, speed=1.0, overrun='catchup', clock=time.monotonic, sleep=time.sleep):
+        """ 初始化.
+
+        :param speed: 仿真速度倍率（仿真秒/墙钟秒）.
+        :param overrun: 超时处理方式. 'catchup' 或 'skip'.
+        :param clock: 单调时钟函数.
+        :param sleep: 等待函数.
+        """
+        assert speed > 0.0
+        assert overrun in ('catchup', 'skip')
+        self.speed = float(speed)
+        self.overrun = overrun
+        self._clock = clock
+        self._sleep = sleep
+        self._wall0 = None
+        self._t0 = None
+        self._begin = None  # 当前步开始时刻.
+        self.lateness = []
+        self.durations = []
+        self.overruns = 0
+
+    def start(self, t0: float):
+        """ 以仿真时间 t0 和当前墙钟时刻为锚点开始. """
+        self._wall0 = self._clock()
+        self._t0 = t0
+        self._begin = None
+        self.lateness = []
+        self.durations = []
+        self.overruns = 0
+
+    def wait(self, t: float):
+        """ 等待仿真时间 t 对应的墙钟截止时间，并记录上一步耗时. """
+        now = self._clock()
+        if self._begin is not None:
+            self.durations.append(now - self._begin)
+        deadline = self._wall0 + (t - self._t0) / self.speed
+        if now < deadline:
+            self._sleep(deadline - now)
+            now = self._clock()
+        elif now > deadline:
+            self.overruns += 1
+            if self.overrun == 'skip':
+                self._wall0 += now - deadline
+        self.lateness.append(now - deadline)
+        self._begin = now
+
+    def finish(self):
+        """ 记录最后一步耗时. """
+        if self._begin is not None:
+            self.durations.append(self._clock() - self._begin)
+            self._begin = None
+
+    def stats(self, percentile=99.0) -> dict:
+        """ 统计: 步数、超时数、延迟与耗时的均值/分位数/最大值 (s). """
+        def summary(values, name):
+            if not values:
+                return {f'{name}_mean': 0.0, f'{name}_p': 0.0, f'{name}_max': 0.0}
+            v = np.asarray(values)
+            return {f'{name}_mean': float(v.mean()), f'{name}_p': float(np.percentile(v, percentile)),
+                    f'{name}_max': float(v.max())}
+
+        ret = {'steps': len(self.lateness), 'overruns': self.overruns}
+        ret.update(summary(self.lateness, 'lateness'))
+        ret.update(summary(self.durations, 'duration'))
+        return ret
@@ -1,11 +1,104 @@
 import copy
+import os
+import struct
+import numpy as np
 from sim import Entity, Environment
 
 
+class ArrayColumn:
+    """ 数值列（列式存储）.
+
+    按块预分配 NumPy 数组，追加时写入当前块，块满后再分配新块；并行保存时间列.
+    数值以 float64 保存，每行形状由第一次追加确定.
+
+    Attributes:
+        shape: 每行形状. 尚未追加时为 None.
+    """
+
+    def __init__(self, chunk=1024):
+        """ 初始化.
+
+        :param chunk: 每块行数.
+        """
+        self.chunk = max(int(chunk), 1)
+        self._values = []  # 数值块列表.
+        self._times = []  # 时间块列表.
+        self._n = 0  # 最后一块已写入行数.
+        self.shape = None
+        self._cache = None  # (values, times) 合并结果缓存.
+
+    def __len__(self):
+        return sum(len(v) for v in self._values[:-1]) + self._n if self._values else 0
+
+    def __getstate__(self):
+        # 序列化时去掉最后一块未使用的部分.
+        state = self.__dict__.copy()
+        if self._values:
+            state['_values'] = self._values[:-1] + [self._values[-1][:self._n].copy()]
+            state['_times'] = self._times[:-1] + [self._times[-1][:self._n].copy()]
+        state['_cache'] = None
+        return state
+
+    def append(self, t, value):
+        """ 追加一行. 形状须与第一行相同，且为数值（布尔、整数或实数）. """
+        v = np.asarray(value)
+        if v.dtype.kind not in 'biuf':
+            raise TypeError(f'column values must be real numbers, got dtype {v.dtype}')
+        if self.shape is None:
+            self.shape = v.shape
+        elif v.shape != self.shape:
+            raise ValueError(f'value shape {v.shape} does not match column shape {self.shape}')
+        if not self._values or self._n == len(self._values[-1]):
+            self._values.append(np.empty((self.chunk,) + self.shape, dtype=np.float64))
+            self._times.append(np.empty(self.chunk, dtype=np.float64))
+            self._n = 0
+        self._values[-1][self._n] = v
+        self._times[-1][self._n] = t
+        self._n += 1
+        self._cache = None
+
+    def values(self) -> np.ndarray:
+        """ 全部数值 (N, ...). """
+        return self._merge()[0]
+
+    def times(self) -> np.ndarray:
+        """ 全部时间 (N,). """
+        return self._merge()[1]
+
+    def _merge(self):
+        if self._cache is None:
+            if not self._values:
+                self._cache = np.zeros(0, dtype=np.float64), np.zeros(0, dtype=np.float64)
+            else:
+                values = self._values[:-1] + [self._values[-1][:self._n]]
+                times = self._times[:-1] + [self._times[-1][:self._n]]
+                self._cache = np.concatenate(values), np.concatenate(times)
+        return self._cache
+
+
+def save_columns(columns, path):
+    """ 保存数值列.
+
+    :param columns: {键: ArrayColumn}.
+    :param path: 以 '.npz' 结尾时保存为单个 npz 文件；否则作为目录，
+        每列保存为 '<键>.npy' 和 '<键>_t.npy'，可用 np.load(..., mmap_mode='r') 内存映射读取.
+    """
+    arrays = {}
+    for k, col in columns.items():
+        arrays[f'{k}'] = col.values()
+        arrays[f'{k}_t'] = col.times()
+    if str(path).endswith('.npz'):
+        np.savez(path, **arrays)
+    else:
+        os.makedirs(path, exist_ok=True)
+        for k, v in arrays.items():
+            np.save(os.path.join(path, f'{k}.npy'), v)
+
+
 class EntityPropRecorder:
     """ 实体+属性 记录. """
 
-    def __init__(self, obj_tag, prop_name: str, show=False, alive=True, not_none=True):
+    def __init__(self, obj_tag, prop_name: str, show=False, alive=True, not_none=True, columnar=False, chunk=1024):
         """ 初始化.
 
         :param obj_tag: 实体标签.
@@ -13,24 +106,45 @@ class EntityPropRecorder:
         :param show: 是否显示.
         :param alive: 是否只记录活动状态.
         :param not_none: 是否只记录非 None 值.
+        :param columnar: 是否采用列式存储（仅数值属性，None 值不记录）.
+        :param chunk: 列式存储每块行数.
         """
         self.obj_id = obj_tag if isinstance(obj_tag, int) else None
         self.obj = obj_tag if isinstance(obj_tag, Entity) else None
         self.prop_name = prop_name
-        self.records = []
+        self.column = ArrayColumn(chunk) if columnar else None
+        self._records = []
         self.show = show
         self.alive = alive
         self.not_none = not_none
 
+    @property
+    def records(self):
+        """ 记录值. 列式存储时为数组 (N, ...). """
+        return self.column.values() if self.column is not None else self._records
+
+    @property
+    def times(self):
+        """ 记录时间（仅列式存储）. """
+        return self.column.times() if self.column is not None else None
+
+    def save(self, path):
+        """ 保存列式记录，参见 save_columns. """
+        assert self.column is not None
+        save_columns({self.obj.id if self.obj else self.obj_id: self.column}, path)
+
     def __call__(self, env: Environment):
         if not self.obj:
             self.obj = env.find(self.obj_id)
         if self.obj and (self.obj.is_alive() if self.alive else True):
             if hasattr(self.obj, self.prop_name):
                 value = getattr(self.obj, self.prop_name)
-                if self.not_none and value is None:
+                if (self.not_none or self.column is not None) and value is None:
                     return
-                self.records.append(copy.copy(value))
+                if self.column is not None:
+                    self.column.append(env.time_info[0], value)
+                else:
+                    self._records.append(copy.copy(value))
                 if self.show:
                     print(f'{env.time_info[0]:.2f} - {self.obj.id} : {value}')
 
@@ -38,23 +152,297 @@ class EntityPropRecorder:
 class PropRecorder:
     """ 属性记录. """
 
-    def __init__(self, prop_name: str, show=False, alive=True):
+    def __init__(self, prop_name: str, show=False, alive=True, columnar=False, chunk=1024):
         """ 初始化.
 
         :param prop_name: 属性名称.
         :param show: 是否显示.
+        :param columnar: 是否采用列式存储（仅数值属性，None 值不记录）.
+        :param chunk: 列式存储每块行数.
         """
         self.prop_name = prop_name
-        self.records = {}
+        self.columns = {} if columnar else None  # id -> ArrayColumn
+        self.chunk = chunk
+        self._records = {}
         self.show = show
         self.alive = alive
 
+    @property
+    def records(self):
+        """ 记录值 {id: 记录}. 列式存储时记录为数组 (N, ...). """
+        if self.columns is not None:
+            return {k: col.values() for k, col in self.columns.items()}
+        return self._records
+
+    @property
+    def times(self):
+        """ 记录时间 {id: 时间数组}（仅列式存储）. """
+        if self.columns is not None:
+            return {k: col.times() for k, col in self.columns.items()}
+        return None
+
+    def save(self, path):
+        """ 保存列式记录，参见 save_columns. """
+        assert self.columns is not None
+        save_columns(self.columns, path)
+
     def __call__(self, env: Environment):
         for obj in env.children:
             if hasattr(obj, self.prop_name) and (obj.is_alive() if self.alive else True):
-                if obj.id not in self.records:
-                    self.records[obj.id] = []
                 value = getattr(obj, self.prop_name)
-                self.records[obj.id].append(copy.copy(value))
+                if self.columns is not None:
+                    if value is None:
+                        continue
+                    if obj.id not in self.columns:
+                        self.columns[obj.id] = ArrayColumn(self.chunk)
+                    self.columns[obj.id].append(env.time_info[0], value)
+                else:
+                    if obj.id not in self._records:
+                        self._records[obj.id] = []
+                    self._records[obj.id].append(copy.copy(value))
                 if self.show:
                     print(f'{env.time_info[0]:.2f} - {obj.id} : {value}')
+
+
+STREAM_MAGIC = b'SIMREC2\n'
+_BLOCK_MAGIC = b'BLCK'
+_BLOCK_HEAD = struct.Struct('<4sIIIBddB')  # 标记, 时间数 T, 实体数 E, 行数, 标志, 起始时间, 结束时间, 值维数.
+_SAME_IDS = 1  # 块标志：实体 id 与上一块相同（不再写入）.
+
+
+class StreamRecorder:
+    """ 流式属性记录（落盘，内存有界）.
+
+    记录方式与 PropRecorder 列式存储相同，但只在内存中保留少量缓冲，
+    缓冲行数达到上限时将全部实体的缓冲写为一个数据块（每种值形状一块）. 文件格式：
+
+        文件头: STREAM_MAGIC, 属性名长度 (uint16), 属性名 (utf-8).
+        数据块: 块头 (标记, 时间数 T, 实体数 E, 行数, 标志, 起始时间, 结束时间, 值维数 k), k 个维度 (uint32),
+                时间 (T 个 float64), 实体 id (E 个 int64，升序；与上一块相同时省略),
+                有效位 (T×E 位，packbits), 数值 (T×E×维度积 个 float64，无记录处为 0). 均为小端.
+
+    数据块按时间×实体排列，实体 id 和每行时间每块只保存一次，实体数超过缓冲行数时也不会产生大量小块.
+    数据块只追加，异常中断时最后一个不完整的块会被 StreamReader 忽略，追加写入 (append) 时被截去.
+    使用 StreamReader 读取.
+    """
+
+    def __init__(self, prop_name: str, path, buffer=4096, alive=True, ids=None, append=False):
+        """ 初始化.
+
+        :param prop_name: 属性名称.
+        :param path: 文件路径.
+        :param buffer: 内存缓冲行数上限（所有实体合计）. 每步记录结束后检查，超过时写入一个数据块.
+        :param alive: 是否只记录活动状态.
+        :param ids: 只记录的实体 id 集合，None 表示全部.
+        :param append: 文件已存在时是否追加（属性名须一致），否则覆盖.
+        """
+        self.prop_name = prop_name
+        self.path = path
+        self.buffer = max(int(buffer), 1)
+        self.alive = alive
+        self.ids = set(ids) if ids is not None else None
+        self._pending = {}  # 值形状 -> {id: ([时间], [数值])}
+        self._count = 0  # 缓冲行数.
+        self._last_ids = None  # 上一块的实体 id.
+        self._file = self._open(append)
+
+    def _open(self, append):
+        if append and os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, 'rb') as f:
+                prop_name, _, end = _scan_blocks(f, os.path.getsize(self.path))
+            if prop_name != self.prop_name:
+                raise ValueError(f'stream file records {prop_name!r}, not {self.prop_name!r}')
+            # 截去异常中断留下的不完整块，否则追加的数据会被当作该块的一部分.
+            with open(self.path, 'r+b') as f:
+                f.truncate(end)
+            return open(self.path, 'ab')
+        f = open(self.path, 'wb')
+        name = self.prop_name.encode('utf-8')
+        f.write(STREAM_MAGIC + struct.pack('<H', len(name)) + name)
+        return f
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __call__(self, env: Environment):
+        t = env.time_info[0]
+        for obj in env.children:
+            if self.ids is not None and obj.id not in self.ids:
+                continue
+            if hasattr(obj, self.prop_name) and (obj.is_alive() if self.alive else True):
+                value = getattr(obj, self.prop_name)
+                if value is None:
+                    continue
+                value = np.array(value, dtype=np.float64)
+                times, values = self._pending.setdefault(value.shape, {}).setdefault(obj.id, ([], []))
+                times.append(t)
+                values.append(value)
+                self._count += 1
+        if self._count >= self.buffer:
+            self.flush()
+
+    def flush(self):
+        """ 将缓冲写入文件. """
+        assert self._file is not None, 'recorder is closed'
+        for shape, rows in self._pending.items():
+            ids = np.array(sorted(rows), dtype='<i8')
+            times = np.unique(np.concatenate([rows[i][0] for i in ids.tolist()])).astype('<f8')
+            mask = np.zeros((len(times), len(ids)), dtype=bool)
+            values = np.zeros((len(times), len(ids)) + shape, dtype='<f8')
+            for j, obj_id in enumerate(ids.tolist()):
+                k = np.searchsorted(times, rows[obj_id][0])
+                mask[k, j] = True
+                values[k, j] = rows[obj_id][1]
+            same = self._last_ids is not None and np.array_equal(ids, self._last_ids)
+            self._file.write(_BLOCK_HEAD.pack(_BLOCK_MAGIC, len(times), len(ids), int(mask.sum()),
+                                              _SAME_IDS if same else 0, times[0], times[-1], len(shape)))
+            self._file.write(struct.pack(f'<{len(shape)}I', *shape))
+            self._file.write(times.tobytes())
+            if not same:
+                self._file.write(ids.tobytes())
+            self._file.write(np.packbits(mask).tobytes())
+            self._file.write(values.tobytes())
+            self._last_ids = ids
+        self._file.flush()
+        self._pending.clear()
+        self._count = 0
+
+    def close(self):
+        """ 写入剩余缓冲并关闭文件. """
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+
+def _read_stream_header(f) -> str:
+    if f.read(len(STREAM_MAGIC)) != STREAM_MAGIC:
+        raise ValueError('not a stream record file')
+    n, = struct.unpack('<H', f.read(2))
+    return f.read(n).decode('utf-8')
+
+
+def _scan_blocks(f, size):
+    """ 扫描文件头和块头.
+
+    :param f: 位于文件开头的文件对象.
+    :param size: 文件长度.
+    :return: (属性名, 块索引 [(时间数, 实体数, 行数, 起始时间, 结束时间, 值形状, 时间偏移, 实体 id 偏移, 有效位偏移)],
+        最后一个完整块的结束位置).
+    """
+    prop_name = _read_stream_header(f)
+    index = []
+    end = f.tell()
+    last_ids = None  # (实体数, 实体 id 偏移)
+    while True:
+        head = f.read(_BLOCK_HEAD.size)
+        if len(head) < _BLOCK_HEAD.size:
+            break
+        magic, n_t, n_e, rows, flags, t0, t1, ndim = _BLOCK_HEAD.unpack(head)
+        if magic != _BLOCK_MAGIC:
+            raise ValueError(f'corrupt block at offset {f.tell() - len(head)}')
+        dims = f.read(4 * ndim)
+        if len(dims) < 4 * ndim:
+            break
+        shape = struct.unpack(f'<{ndim}I', dims)
+        t_offset = f.tell()
+        if flags & _SAME_IDS:
+            if last_ids is None or last_ids[0] != n_e:
+                raise ValueError(f'block at offset {t_offset} refers to missing entity ids')
+            ids_offset = last_ids[1]
+            mask_offset = t_offset + 8 * n_t
+        else:
+            ids_offset = t_offset + 8 * n_t
+            mask_offset = ids_offset + 8 * n_e
+        block_end = mask_offset + (n_t * n_e + 7) // 8 + 8 * n_t * n_e * int(np.prod(shape))
+        if block_end > size:
+            break  # 不完整的块.
+        index.append((n_t, n_e, rows, t0, t1, shape, t_offset, ids_offset, mask_offset))
+        last_ids = n_e, ids_offset
+        end = block_end
+        f.seek(end)
+    return prop_name, index, end
+
+
+class StreamReader:
+    """ 流式记录文件读取.
+
+    打开时只扫描块头建立索引（每个数据块一项，与记录行数和实体数无关）；
+    按实体 id 和时间范围读取时只加载相关数据块中该实体的数据.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.prop_name, self._index, _ = _scan_blocks(f, os.path.getsize(path))
+
+    @property
+    def ids(self) -> list:
+        """ 全部实体 id. """
+        ids = set()
+        with open(self.path, 'rb') as f:
+            for offset, n_e in {(c[7], c[1]) for c in self._index}:
+                ids.update(self._read_ids(f, offset, n_e).tolist())
+        return sorted(ids)
+
+    def __len__(self):
+        return sum(c[2] for c in self._index)
+
+    @staticmethod
+    def _read_ids(f, offset, n):
+        f.seek(offset)
+        return np.frombuffer(f.read(8 * n), dtype='<i8')
+
+    def chunks(self, obj_id=None, t0=None, t1=None):
+        """ 按块迭代记录.
+
+        :param obj_id: 实体 id，None 表示全部.
+        :param t0: 起始时间（含），None 表示不限.
+        :param t1: 结束时间（含），None 表示不限.
+        :return: 迭代 (实体 id, 时间 (n,), 数值 (n, ...)).
+        """
+        with open(self.path, 'rb') as f:
+            for n_t, n_e, _, c0, c1, shape, t_offset, ids_offset, mask_offset in self._index:
+                if (t0 is not None and c1 < t0) or (t1 is not None and c0 > t1):
+                    continue
+                ids = self._read_ids(f, ids_offset, n_e)
+                if obj_id is None:
+                    cols = range(n_e)
+                else:
+                    j = int(np.searchsorted(ids, obj_id))
+                    if j == n_e or ids[j] != obj_id:
+                        continue
+                    cols = [j]
+                f.seek(t_offset)
+                times = np.frombuffer(f.read(8 * n_t), dtype='<f8')
+                f.seek(mask_offset)
+                n_mask = (n_t * n_e + 7) // 8
+                mask = np.unpackbits(np.frombuffer(f.read(n_mask), dtype=np.uint8), count=n_t * n_e)
+                mask = mask.reshape(n_t, n_e).astype(bool)
+                if t0 is not None:
+                    mask &= (times >= t0)[:, None]
+                if t1 is not None:
+                    mask &= (times <= t1)[:, None]
+                values = np.memmap(self.path, dtype='<f8', mode='r', offset=mask_offset + n_mask,
+                                   shape=(n_t, n_e) + shape)
+                for j in cols:
+                    rows = mask[:, j]
+                    if rows.any():
+                        yield int(ids[j]), times[rows], np.array(values[rows, j])
+                del values
+
+    def read(self, obj_id, t0=None, t1=None):
+        """ 读取单个实体的记录.
+
+        :return: (时间 (N,), 数值 (N, ...)).
+        """
+        times, values = [], []
+        for _, t, v in self.chunks(obj_id, t0, t1):
+            times.append(t)
+            values.append(v)
+        if not times:
+            return np.zeros(0, dtype=np.float64), np.zeros(0, dtype=np.float64)
+        return np.concatenate(times), np.concatenate(values)
@@ -0,0 +1,230 @@
+"""
+场景文件：以 JSON/YAML 声明场景，构建环境并运行（不依赖绘图模块）.
+
+格式:
+    env:                    # Environment.run 参数 (start, stop, step, seed, cell, advance, ...).
+      stop: 40
+    entities:               # 实体列表，按顺序加入环境.
+      - type: uav           # 类型名（见 ENTITY_TYPES）或 'module:Class'.
+        name: uav1          # 其余键作为构造参数.
+        track: [[0, 100, 10], [100, 100, 10]]
+        speed: 2.5
+      - type: move
+        pos: [0, 0]
+        policy: mymodule:MyPolicy   # 'module:Class'，无参构造.
+      - type: pairwise_force
+        law: {type: gravity, G: 1000}   # 作用力规律（见 LAWS），其余键为规律参数.
+        members: [earth, moon]          # 成员名称，须已在前面声明.
+    events:                 # 定时事件 (EventScheduler 参数 dt/times/rand/seed).
+      - target: jammer2     # 实体名称.
+        toggle: power_on    # 取反属性；或 set: {power_on: true} 设置属性.
+        times: [3, 5]
+    record:                 # 属性记录.
+      - prop: pos
+        mode: columnar      # columnar（运行结束后保存）或 stream（运行中落盘，需指定输出目录）.
+
+Usages:
+    scenario = load('scenario.yaml', out='results')
+    stats = scenario.run()
+    scenario.save('results')
+"""
+
+import importlib
+import json
+import os
+import time
+from . import Environment, EventScheduler
+from .recorder import PropRecorder, StreamRecorder
+
+ENTITY_TYPES = {
+    'entity': 'sim.entity:Entity',
+    'move': 'sim.move:MoveEntity',
+    'uav': 'sim.common:Uav',
+    'uav_fleet': 'sim.common:UavFleet',
+    'radar': 'sim.common:Radar',
+    'jammer': 'sim.common:Jammer',
+    'pairwise_force': 'sim.interact:PairwiseForce',
+}
+
+LAWS = {
+    'gravity': 'sim.interact:gravity',
+    'repulsion': 'sim.interact:repulsion',
+    'separation': 'sim.interact:separation',
+}
+
+
+def import_object(path: str):
+    """ 按 'module:name' 导入对象. """
+    module, _, name = path.partition(':')
+    if not module or not name:
+        raise ValueError(f'expected "module:name", got {path!r}')
+    try:
+        return getattr(importlib.import_module(module), name)
+    except (ImportError, AttributeError) as e:
+        raise ValueError(f'cannot import {path!r}: {e}') from e
+
+
+def load_spec(path) -> dict:
+    """ 读取场景文件（.json 或 .yaml/.yml）. 文件格式错误时抛出 ValueError. """
+    with open(path, encoding='utf-8') as f:
+        if str(path).endswith(('.yaml', '.yml')):
+            import yaml  # 仅 YAML 场景需要.
+            try:
+                spec = yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise ValueError(f'invalid YAML: {e}') from e
+        else:
+            try:
+                spec = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f'invalid JSON: {e}') from e
+    if not isinstance(spec, dict):
+        raise ValueError('scenario must be a mapping')
+    return spec
+
+
+def needs_output(spec: dict) -> bool:
+    """ 场景是否需要输出目录（含流式记录）. """
+    return any(isinstance(item, dict) and item.get('mode') == 'stream' for item in spec.get('record') or [])
+
+
+class SetAttr:
+    """ 设置实体属性的事件（可序列化，用于检查点）. """
+
+    def __init__(self, target: str, values=None, toggle=None):
+        """ 初始化.
+
+        :param target: 实体名称.
+        :param values: 设置的属性 {属性名: 值}.
+        :param toggle: 取反的属性名.
+        """
+        self.target = target
+        self.values = dict(values or {})
+        self.toggle = toggle
+
+    def __call__(self, env: Environment):
+        obj = env.find(self.target)
+        if obj is None:
+            return
+        for k, v in self.values.items():
+            setattr(obj, k, v)
+        if self.toggle:
+            setattr(obj, self.toggle, not getattr(obj, self.toggle))
+
+
+class Scenario:
+    """ 场景.
+
+    Attributes:
+        env: 环境.
+        recorders: {属性名: 记录器}.
+        run_params: Environment.run 参数.
+    """
+
+    def __init__(self, spec: dict, out=None):
+        """ 根据场景描述构建环境.
+
+        :param spec: 场景描述（见模块说明）.
+        :param out: 输出目录. 流式记录需要.
+        """
+        self.spec = spec
+        self.env = Environment()
+        self.recorders = {}
+        self.run_params = dict(spec.get('env') or {})
+        for item in spec.get('entities') or []:
+            self.env.add(self._build_entity(dict(item)))
+        for item in spec.get('events') or []:
+            self.env.step_events.append(self._build_event(dict(item)))
+        for item in spec.get('record') or []:
+            self._build_recorder(dict(item), out)
+
+    def _build_entity(self, kwargs):
+        kind = kwargs.pop('type', 'entity')
+        cls = import_object(ENTITY_TYPES.get(kind, kind))
+        if isinstance(kwargs.get('policy'), str):
+            kwargs['policy'] = import_object(kwargs['policy'])()
+        if 'law' in kwargs:
+            law = kwargs['law']
+            law = dict(law) if isinstance(law, dict) else {'type': law}
+            name = law.pop('type')
+            kwargs['law'] = import_object(LAWS.get(name, name))(**law)
+        if 'members' in kwargs and kwargs['members'] is not None:
+            members = [self.env.find(tag) for tag in kwargs['members']]
+            if None in members:
+                raise ValueError(f'unknown member in {kwargs["members"]}')
+            kwargs['members'] = members
+        try:
+            return cls(**kwargs)
+        except TypeError as e:
+            raise ValueError(f'bad parameters for entity type {kind!r}: {e}') from e
+
+    def _build_event(self, kwargs):
+        if 'target' not in kwargs:
+            raise ValueError(f'event needs a "target": {kwargs}')
+        evt = SetAttr(kwargs.pop('target'), kwargs.pop('set', None), kwargs.pop('toggle', None))
+        try:
+            return EventScheduler(evt=evt, **kwargs)
+        except TypeError as e:
+            raise ValueError(f'bad event parameters: {e}') from e
+
+    def _build_recorder(self, kwargs, out):
+        if 'prop' not in kwargs:
+            raise ValueError(f'record entry needs a "prop": {kwargs}')
+        prop = kwargs['prop']
+        if prop in self.recorders:
+            raise ValueError(f'property {prop!r} is recorded more than once')
+        mode = kwargs.get('mode', 'columnar')
+        if mode == 'stream':
+            if out is None:
+                raise ValueError('stream recording requires an output directory')
+            os.makedirs(out, exist_ok=True)
+            rec = StreamRecorder(prop, os.path.join(out, f'{prop}.rec'), buffer=kwargs.get('buffer', 4096))
+        elif mode == 'columnar':
+            rec = PropRecorder(prop, columnar=True, chunk=kwargs.get('chunk', 1024))
+        else:
+            raise ValueError(f'unknown record mode {mode!r}')
+        self.recorders[prop] = rec
+        self.env.step_events.append(rec)
+
+    def run(self, **kwargs) -> dict:
+        """ 运行.
+
+        :param kwargs: Environment.run 参数，覆盖场景文件中的设置.
+        :return: 运行统计.
+        """
+        params = dict(self.run_params, **kwargs)
+        t0 = time.perf_counter()
+        self.env.run(**params)
+        wall = time.perf_counter() - t0
+        for rec in self.recorders.values():
+            if isinstance(rec, StreamRecorder):
+                rec.flush()
+        ticks = self.env.ticks
+        _, step = self.env.time_info
+        entities = len(self.env.children)
+        return {
+            'entities': entities,
+            'steps': ticks,
+            'sim_time': ticks * step,
+            'wall_time': wall,
+            'steps_per_sec': ticks / wall if wall > 0 else float('inf'),
+            'entity_steps_per_sec': ticks * entities / wall if wall > 0 else float('inf'),
+        }
+
+    def save(self, out):
+        """ 保存记录结果：列式记录保存为 '<属性名>.npz'，流式记录写完并关闭. """
+        os.makedirs(out, exist_ok=True)
+        for prop, rec in self.recorders.items():
+            if isinstance(rec, StreamRecorder):
+                rec.close()
+            elif rec.columns:
+                rec.save(os.path.join(out, f'{prop}.npz'))
+
+
+def load(path, out=None) -> Scenario:
+    """ 读取场景文件并构建场景.
+
+    :param path: 场景文件路径.
+    :param out: 输出目录. 流式记录需要.
+    """
+    return Scenario(load_spec(path), out=out)
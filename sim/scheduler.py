@@ -28,6 +28,7 @@ class EventScheduler:
         :param dt: 按照固定事件间隔调用事件.
         :param times: 按照规定的事件序列调用事件.
         :param rand: 按照随机的事件间隔调用事件.
+        :param seed: 随机间隔的随机数种子. 未指定时使用环境随机数发生器 env.random.
         """
         self.evt = evt
         self.type = EventScheduler.TimerType.UNKNOWN
@@ -35,6 +36,8 @@ class EventScheduler:
         self.rng = None
         self.times = None
         self._check_pt = None  # 当前检查时间点（用于启动事件）
+        self._times_idx = 0  # TIMES 模式下 _check_pt 在 times 中的序号.
+        self._random = None  # 随机数发生器.
         self._env = None
         self.set_params(**kwargs)
 
@@ -45,9 +48,12 @@ class EventScheduler:
         if 'rand' in kwargs:
             self.rng = sorted(kwargs['rand'])
             self.type = EventScheduler.TimerType.RAND
+        if 'seed' in kwargs:
+            self._random = random.Random(kwargs['seed'])
         if 'times' in kwargs:
             self.times = sorted(list(set(kwargs['times'])))
             self.type = EventScheduler.TimerType.TIMES
+            self._check_pt = None
 
     def __call__(self, env: Environment):
         self._env = env
@@ -55,27 +61,47 @@ class EventScheduler:
         if self._check_and_update(now, env) and self.evt:
             self.evt(env)
 
-    def __rand_time(self):
-        return random.random() * (self.rng[1] - self.rng[0]) + self.rng[0]
+    def next_time(self, env: Environment):
+        """ 下次检查时间点. 供环境事件队列排序使用，None 表示不再触发. """
+        self._env = env
+        self._init_check_pt(env)
+        return self._check_pt
+
+    def is_due(self, env: Environment) -> bool:
+        """ 当前时刻是否到期. """
+        self._env = env
+        now, _ = env.time_info
+        return self._check_now(now)
+
+    def __rand_time(self, env):
+        rand = self._random if self._random is not None else env.random
+        return rand.random() * (self.rng[1] - self.rng[0]) + self.rng[0]
+
+    def _init_check_pt(self, env):
+        if self._check_pt is not None:
+            return
+        if self.type == EventScheduler.TimerType.FIX:
+            self._check_pt = env.clock_info[0]
+        elif self.type == EventScheduler.TimerType.RAND:
+            self._check_pt = env.clock_info[0] + self.__rand_time(env)
+        elif self.type == EventScheduler.TimerType.TIMES and len(self.times) > 0:
+            self._times_idx = 0
+            self._check_pt = self.times[0]
 
     def _check_and_update(self, now, env) -> bool:
+        self._init_check_pt(env)
         if self.type == EventScheduler.TimerType.FIX:
-            if self._check_pt is None:
-                self._check_pt = env.clock_info[0]
             if self._check_now(now):
                 self._check_pt += self.dt
                 return True
         if self.type == EventScheduler.TimerType.RAND:
-            if self._check_pt is None:
-                self._check_pt = env.clock_info[0] + self.__rand_time()
             if self._check_now(now):
-                self._check_pt += self.__rand_time()
+                self._check_pt += self.__rand_time(env)
                 return True
         if self.type == EventScheduler.TimerType.TIMES:
-            if self._check_pt is None and len(self.times) > 0:
-                self._check_pt = self.times[0]
             if self._check_now(now):
-                idx = self.times.index(self._check_pt) + 1
+                self._times_idx += 1
+                idx = self._times_idx
                 self._check_pt = self.times[idx] if idx < len(self.times) else None
                 return True
         return False
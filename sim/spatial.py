@@ -0,0 +1,94 @@
+"""
+空间索引：均匀网格，用于按作用半径筛选交互对象.
+"""
+
+from typing import List, Optional
+import numpy as np
+
+
+def position_of(obj) -> Optional[np.ndarray]:
+    """ 获取实体位置（position 或 pos 属性），无位置返回 None. """
+    for name in ('position', 'pos'):
+        v = getattr(obj, name, None)
+        if isinstance(v, np.ndarray) and v.ndim == 1:
+            return v
+    return None
+
+
+class _DimGrid:
+    """ 同一维度实体的网格. """
+
+    def __init__(self, cell: float, indices, positions):
+        self.cell = cell
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.positions = np.asarray(positions, dtype=np.float64)
+        self.cells = {}
+
+        keys = np.floor(self.positions / cell).astype(np.int64)
+        order = np.lexsort(keys.T[::-1])
+        keys = keys[order]
+        bounds = np.flatnonzero(np.any(keys[1:] != keys[:-1], axis=1)) + 1
+        starts = np.concatenate([[0], bounds])
+        ends = np.concatenate([bounds, [len(order)]])
+        for s, e in zip(starts, ends):
+            self.cells[tuple(keys[s])] = order[s:e]
+
+    def query(self, center, radius):
+        lo = np.floor((center - radius) / self.cell).astype(np.int64)
+        hi = np.floor((center + radius) / self.cell).astype(np.int64)
+        if np.prod(hi - lo + 1) > len(self.cells):
+            cand = np.arange(len(self.indices))
+        else:
+            grids = np.meshgrid(*[np.arange(a, b + 1) for a, b in zip(lo, hi)], indexing='ij')
+            found = [self.cells.get(k) for k in zip(*[g.ravel().tolist() for g in grids])]
+            found = [f for f in found if f is not None]
+            if not found:
+                return self.indices[:0]
+            cand = np.concatenate(found)
+        d = np.linalg.norm(self.positions[cand] - center, axis=1)
+        return self.indices[cand[d <= radius]]
+
+
+class GridIndex:
+    """ 均匀网格空间索引.
+
+    每步由环境根据实体快照重建一次. 无位置的实体总是作为候选对象返回.
+    """
+
+    def __init__(self, cell: float):
+        """ 初始化.
+
+        :param cell: 网格边长.
+        """
+        assert cell > 0.0
+        self.cell = float(cell)
+        self._grids = {}  # dim -> _DimGrid
+        self._unlocated = np.zeros(0, dtype=np.int64)
+
+    def build(self, objs: List):
+        """ 根据对象列表重建索引. """
+        located = {}
+        unlocated = []
+        for i, obj in enumerate(objs):
+            pos = position_of(obj)
+            if pos is None:
+                unlocated.append(i)
+            else:
+                located.setdefault(len(pos), ([], []))
+                located[len(pos)][0].append(i)
+                located[len(pos)][1].append(pos)
+        self._grids = {d: _DimGrid(self.cell, idx, pts) for d, (idx, pts) in located.items()}
+        self._unlocated = np.asarray(unlocated, dtype=np.int64)
+
+    def query(self, center, radius: float) -> np.ndarray:
+        """ 查询距离 center 不超过 radius 的对象序号（升序）.
+
+        不同维度的对象以及无位置的对象无法比较距离，总是返回.
+        """
+        found = [self._unlocated]
+        for d, grid in self._grids.items():
+            if d == len(center):
+                found.append(grid.query(center, radius))
+            else:
+                found.append(grid.indices)
+        return np.sort(np.concatenate(found))
@@ -0,0 +1,98 @@
+"""
+状态存储：按维度分块的结构化数组 (N, D)，保存运动实体的位置与速度.
+"""
+
+import numpy as np
+
+
+class StateBlock:
+    """ 同一维度实体的状态块.
+
+    Attributes:
+        pos: 位置数组 (capacity, dim).
+        vel: 速度数组 (capacity, dim).
+        active: 行是否被占用.
+    """
+
+    def __init__(self, dim: int, capacity=64):
+        self.dim = dim
+        self.pos = np.zeros((capacity, dim), dtype=np.float64)
+        self.vel = np.zeros((capacity, dim), dtype=np.float64)
+        self.active = np.zeros(capacity, dtype=bool)
+        self._free = list(range(capacity - 1, -1, -1))
+        self._count = 0  # 已占用行数.
+        self._hi = 0  # 已使用行的上界.
+
+    @property
+    def capacity(self) -> int:
+        return len(self.active)
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def alloc(self) -> int:
+        """ 分配一行，返回行号. """
+        if not self._free:
+            self._grow()
+        slot = self._free.pop()
+        self.active[slot] = True
+        self._count += 1
+        self._hi = max(self._hi, slot + 1)
+        return slot
+
+    def release(self, slot: int):
+        """ 释放一行. """
+        if self.active[slot]:
+            self.active[slot] = False
+            self.pos[slot] = 0.0
+            self.vel[slot] = 0.0
+            self._free.append(slot)
+            self._count -= 1
+
+    def integrate(self, dt: float):
+        """ 一次性完成所有行的位置积分: pos += dt * vel. """
+        if self._count <= 0:
+            return
+        hi = self._hi
+        pos, vel = self.pos[:hi], self.vel[:hi]
+        if self._count == hi:
+            pos += dt * vel
+        else:
+            mask = self.active[:hi]
+            pos[mask] += dt * vel[mask]
+
+    def _grow(self):
+        old = self.capacity
+        new = max(2 * old, 1)
+        self.pos = np.concatenate([self.pos, np.zeros((new - old, self.dim), dtype=np.float64)])
+        self.vel = np.concatenate([self.vel, np.zeros((new - old, self.dim), dtype=np.float64)])
+        self.active = np.concatenate([self.active, np.zeros(new - old, dtype=bool)])
+        self._free.extend(range(new - 1, old - 1, -1))
+
+
+class StateStore:
+    """ 状态存储.
+
+    由环境持有. 运动实体加入环境时在对应维度的状态块中分配一行，
+    之后通过 (block, slot) 读写自身 pos/vel；环境每步对所有状态块做一次向量化积分.
+    """
+
+    def __init__(self, capacity=64):
+        self._capacity = capacity
+        self._blocks = {}  # dim -> StateBlock
+
+    def block(self, dim: int) -> StateBlock:
+        """ 获取（必要时创建）指定维度的状态块. """
+        if dim not in self._blocks:
+            self._blocks[dim] = StateBlock(dim, self._capacity)
+        return self._blocks[dim]
+
+    @property
+    def blocks(self):
+        return self._blocks
+
+    def integrate(self, dt: float):
+        """ 所有状态块位置积分. """
+        for block in self._blocks.values():
+            block.integrate(dt)
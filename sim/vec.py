@@ -12,22 +12,41 @@ def vec(val):
     return np.array(val, dtype=np.float)
 
 
+def as_vec(val):
+    """ 数值向量化. 已是浮点数组时直接返回，不拷贝. """
+    return np.asarray(val, dtype=np.float64)
+
+
 def dist(pos0, pos1=None) -> float:
     """ 计算向量距离（模）. """
-    pos = (vec(pos0) - vec(pos1)) if pos1 is not None else vec(pos0)
+    v0 = as_vec(pos0)
+    if v0.ndim == 1:
+        return math.dist(v0, as_vec(pos1)) if pos1 is not None else math.hypot(*v0)
+    pos = (v0 - as_vec(pos1)) if pos1 is not None else v0
     return np.linalg.norm(pos)
 
 
-def unit(v):
-    """ 计算单位向量. """
-    v2 = vec(v)
+def unit(v, out=None):
+    """ 计算单位向量.
+
+    :param v: 向量.
+    :param out: 结果缓冲区. 指定时结果写入 out（可与 v 相同），不分配新数组.
+    :return: 单位向量.
+    """
+    v2 = as_vec(v)
     d = dist(v2)
-    return (v2 / d) if d > 0.0 else zeros_like(v2)
+    if out is None:
+        return (v2 / d) if d > 0.0 else zeros_like(v2)
+    if d > 0.0:
+        np.divide(v2, d, out=out)
+    else:
+        out.fill(0.0)
+    return out
 
 
 def zeros_like(v):
     """ 生成全零向量. """
-    return np.zeros_like(vec(v))
+    return np.zeros_like(as_vec(v))
 
 
 def angle(v1, v2) -> float:
@@ -0,0 +1,56 @@
+import unittest
+import os
+import tempfile
+from functools import partial
+import numpy as np
+from sim import Environment, EventScheduler, checkpoint
+from sim.move import MoveEntity
+from sim.common import Uav, Jammer
+from sim.recorder import PropRecorder
+
+
+def switch(env, jammer):
+    jammer.power_on = not jammer.power_on
+
+
+def build():
+    env = Environment()
+    env.set_params(seed=3)
+    env.add_many(MoveEntity(pos=[i, 0, 0], vel=[0, 1, 0]) for i in range(100))
+    env.add(Uav(track=[[0, 0, 10], [50, 0, 10], [50, 50, 10]], speed=2.0))
+    jammer = env.add(Jammer(kind='gps'))
+    env.step_events.append(EventScheduler(evt=partial(switch, jammer=jammer), rand=[1, 3]))
+    env.step_events.append(PropRecorder('position', columnar=True))
+    return env
+
+
+class TestCheckpoint(unittest.TestCase):
+    def test_restore(self):
+        """ 测试检查点恢复后继续运行与不中断运行结果一致. """
+        env = build()
+        env.set_params(stop=20.0)
+        env.reset()
+        for _ in range(50):
+            env.step()
+        now, _ = env.time_info
+        data = checkpoint.dumps(env)
+        while not env.is_over():
+            env.step()
+
+        for _ in range(2):
+            env2 = checkpoint.loads(data)
+            self.assertEqual(env2.time_info[0], now)
+            while not env2.is_over():
+                env2.step()
+            np.testing.assert_almost_equal(env2.store.blocks[3].pos, env.store.blocks[3].pos)
+            uav, uav2 = env.children[100], env2.children[100]
+            np.testing.assert_almost_equal(uav.position, uav2.position)
+            self.assertEqual(uav.control.state, uav2.control.state)
+            rec, rec2 = env.step_events[1], env2.step_events[1]
+            np.testing.assert_almost_equal(rec.records[uav.id], rec2.records[uav2.id])
+            self.assertTrue(env2.children[0].env is env2)
+
+        with tempfile.TemporaryDirectory() as path:
+            checkpoint.save(env, os.path.join(path, 'a.ckpt'))
+            env3 = checkpoint.load(os.path.join(path, 'a.ckpt'))
+            self.assertEqual(len(env3.children), len(env.children))
@@ -0,0 +1,97 @@
+import unittest
+import numpy as np
+from sim import Environment
+from sim.common import Uav, Jammer
+from sim.ensemble import Ensemble, EnsembleRecorder
+from sim.interact import PairwiseForce, gravity
+from sim.move import MoveEntity
+from sim.recorder import PropRecorder
+
+
+def build_bodies(seed):
+    rng = np.random.default_rng(seed)
+    env = Environment()
+    for _ in range(4):
+        env.add(MoveEntity(props={'m': rng.uniform(1, 2)}, pos=rng.uniform(-100, 100, 2), vel=rng.uniform(-1, 1, 2)))
+    env.add(PairwiseForce(gravity(G=1.0e3)))
+    return env
+
+
+def build_uavs(seed):
+    env = Environment()
+    env.add(Uav(track=[[0, seed], [100, seed]], speed=1.0 + seed))
+    env.add(MoveEntity(pos=[0, 0], vel=[seed, 1]))
+    return env
+
+
+def build_jammed(seed):
+    rng = np.random.default_rng(seed)
+    env = Environment()
+    for _ in range(6):
+        env.add(Uav(track=rng.uniform(-100, 100, (4, 2)).tolist(), speed=4.0))
+    env.add(Jammer(pos=[0, 0], range=50.0, power_on=True))
+    env.add(Jammer(kind='gps', pos=[60, 60], range=30.0, power_on=seed % 2 == 0))
+    return env
+
+
+class TestEnsemble(unittest.TestCase):
+    def check(self, factory, prop, seeds, stop):
+        """ 集合运行结果与逐个副本单独运行一致. """
+        ensemble = Ensemble(factory, seeds)
+        recorder = EnsembleRecorder(prop)
+        ensemble.step_events.append(recorder)
+        ensemble.run(stop=stop)
+        records = recorder.records
+        self.assertEqual(len(recorder.times), ensemble.envs[0].ticks)
+
+        for k, seed in enumerate(seeds):
+            env = factory(seed)
+            single = PropRecorder(prop)
+            env.step_events.append(single)
+            env.run(stop=stop)
+            for j, obj in enumerate(env.children):
+                if j in records:
+                    self.assertEqual(records[j].shape[0], len(seeds))
+                    np.testing.assert_allclose(records[j][k], np.array(single.records[obj.id]), atol=1e-9)
+                    np.testing.assert_allclose(getattr(ensemble.envs[k].children[j], prop), getattr(obj, prop), atol=1e-9)
+
+    def test_bodies(self):
+        self.check(build_bodies, 'pos', range(5), 20.0)
+
+    def test_uavs(self):
+        self.check(build_uavs, 'position', range(3), 10.0)
+        self.check(build_uavs, 'pos', range(3), 10.0)
+
+    def test_uav_states(self):
+        """ 批量计算的无人机状态与逐个副本单独运行一致. """
+        seeds = range(8)
+        ensemble = Ensemble(build_jammed, seeds)
+        ensemble.run(stop=20.0)
+        self.assertTrue(all(obj.batched for env in ensemble.envs for obj in env.children if isinstance(obj, Uav)))
+        states = set()
+        for env, seed in zip(ensemble.envs, seeds):
+            single = build_jammed(seed)
+            single.run(stop=20.0)
+            for a, b in zip(env.children, single.children):
+                if isinstance(a, Uav):
+                    self.assertEqual(a.control.state, b.control.state)
+                    self.assertEqual(a.track.wp_index, b.track.wp_index)
+                    self.assertAlmostEqual(a.life, b.life)
+                    np.testing.assert_allclose(a.position, b.position, atol=1e-9)
+                    states.add(b.control.state)
+        self.assertTrue(len(states) >= 4)
+
+    def test_release(self):
+        """ 释放后副本恢复单独运行. """
+        with Ensemble(build_bodies, range(2)) as ensemble:
+            ensemble.run(stop=1.0)
+            force = ensemble.envs[0].children[-1]
+            self.assertTrue(force.batched)
+        self.assertFalse(force.batched)
+        env = ensemble.envs[0]
+        env.run(stop=5.0)
+        single = build_bodies(0)
+        single.run(stop=5.0)
+        for a, b in zip(env.children, single.children):
+            if isinstance(a, MoveEntity):
+                np.testing.assert_allclose(a.pos, b.pos, atol=1e-9)
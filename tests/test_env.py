@@ -1,6 +1,9 @@
 import unittest
+import numpy as np
 
-from sim import Environment, Entity
+from sim import Environment, Entity, EventScheduler
+from sim.vec import vec
+from sim.move import MoveEntity, MovePolicy
 
 
 class MockEntity(Entity):
@@ -75,6 +78,35 @@ class TestEnv(unittest.TestCase):
         obj2 = env.find('jerry')
         self.assertTrue(obj2 is None)
 
+        # 加入环境后修改名称.
+        obj1.name = 'jerry'
+        self.assertIs(env.find('jerry'), obj1)
+        self.assertIsNone(env.find('tom'))
+        obj3 = env.add(Entity())
+        obj3.name = 'x'
+        self.assertIs(env.find('x'), obj3)
+        env.remove(obj3)
+        obj3.name = 'y'
+        self.assertIsNone(env.find('y'))
+
+    def test_add_many(self):
+        """ 测试批量增加. """
+        env = Environment()
+
+        obj1 = env.add(Entity(name='tom'))
+        objs = env.add_many([obj1, Entity(name='tom'), Entity(), None])
+        self.assertEqual(len(objs), 2)
+        self.assertEqual(len(env.children), 3)
+        self.assertTrue(all(obj.env is env for obj in objs))
+        self.assertTrue(env.find(objs[1].id) is objs[1])
+
+        self.assertTrue(env.find('tom') is obj1)
+        env.remove('tom')
+        self.assertTrue(env.find('tom') is objs[0])
+        env.remove(objs[0])
+        self.assertTrue(env.find('tom') is None)
+        self.assertTrue(env.find(obj1) is None)
+
     def test_run(self):
         """ 测试运行. """
         env = Environment()
@@ -107,6 +139,72 @@ class TestEnv(unittest.TestCase):
         self.assertAlmostEqual(evt.time_records[0], 0.0)
         self.assertAlmostEqual(evt.time_records[-1], 10.0)
 
+    def test_update_period(self):
+        """ 测试多速率更新. """
+
+        class SlowEntity(MockEntity):
+            def __init__(self):
+                super().__init__()
+                self.dts = []
+                self.seen = []
+
+            def step(self, time_info):
+                self.dts.append(time_info[1])
+
+            def access(self, others):
+                self.seen.append(len(others))
+
+        env = Environment()
+        fast = env.add(MockEntity())
+        slow = env.add(SlowEntity())
+        slow.update_period = 0.5
+        env.run(stop=10.0, step=0.1)
+
+        self.assertEqual(fast.value, 101 - 0.5 * 101)
+        self.assertEqual(len(slow.dts), 21)
+        self.assertAlmostEqual(slow.dts[0], 0.1)
+        for dt in slow.dts[1:]:
+            self.assertAlmostEqual(dt, 0.5)
+        self.assertEqual(slow.seen, [1] * 21)
+
+        # 未到期分组中的实体不被遍历.
+        class Counted(SlowEntity):
+            checks = 0
+
+            def is_alive(self):
+                Counted.checks += 1
+                return True
+
+        class Stepper(Entity):
+            def step(self, time_info):
+                pass
+
+        env = Environment()
+        env.add(Stepper())
+        for _ in range(50):
+            env.add(Counted()).update_period = 1.0
+        env.run(stop=10.0, step=0.1)
+        # 只在到期步 (11 步) 中判断活动状态：到期判断、交互视图和步进各一次.
+        self.assertEqual(Counted.checks, 50 * 11 * 3)
+
+    def test_profile(self):
+        """ 测试步进计时统计. """
+        env = Environment()
+        self.assertTrue(env.profiler is None)
+        env.add(MockEntity())
+        env.step_events.append(MockEvent())
+
+        env.run(profile=True)
+        report = env.profiler.report(kind='phase')
+        self.assertEqual({r['name'] for r in report}, {''})
+        self.assertEqual({r['phase'] for r in report}, {'access', 'step', 'integrate', 'events'})
+        self.assertTrue(all(r['count'] == 101 for r in report))
+        self.assertEqual(env.profiler.report(kind='entity', phase='step')[0]['name'], 'MockEntity')
+        self.assertEqual(env.profiler.report(kind='event')[0]['name'], 'MockEvent')
+
+        env.run(profile=False)
+        self.assertTrue(env.profiler is None)
+
     def test_access(self):
         env = Environment()
 
@@ -117,3 +215,57 @@ class TestEnv(unittest.TestCase):
 
         self.assertAlmostEqual(obj1.value, 101.0 / 2)
         self.assertAlmostEqual(obj2.value, 101.0 / 2)
+
+    def test_interaction_radius(self):
+        """ 测试按交互半径筛选交互对象. """
+        env = Environment()
+
+        center = env.add(MockEntity())
+        center.position = vec([0.0, 0.0])
+        center.interaction_radius = 1.5
+        near = env.add(MockEntity())
+        near.position = vec([1.0, 1.0])
+        far = env.add(MockEntity())
+        far.position = vec([10.0, 0.0])
+        free = env.add(MockEntity())
+
+        env.run(stop=0.05)
+        self.assertAlmostEqual(center.value, 1 - 0.5 * 2)
+        self.assertAlmostEqual(far.value, 1 - 0.5 * 3)
+        self.assertAlmostEqual(free.value, 1 - 0.5 * 3)
+
+    def test_snapshot(self):
+        """ 测试写时拷贝快照与深拷贝快照结果一致. """
+
+        class FollowPolicy(MovePolicy):
+            def access(self, others):
+                for obj in others:
+                    self.parent.vel += 0.1 * obj.vel
+
+        results = []
+        for mode in ['copy', 'cow']:
+            env = Environment()
+            env.set_params(snapshot=mode)
+            obj1 = env.add(MoveEntity(pos=[0, 0], vel=[1, 0], policy=FollowPolicy()))
+            obj2 = env.add(MoveEntity(pos=[0, 0], vel=[0, 1], policy=FollowPolicy()))
+            env.add(MoveEntity(pos=[0, 0], vel=[1, 1]))
+            env.run(stop=1.0)
+            results.append((obj1.pos.copy(), obj2.pos.copy()))
+        np.testing.assert_almost_equal(results[0][0], results[1][0])
+        np.testing.assert_almost_equal(results[0][1], results[1][1])
+
+    def test_policy_change(self):
+        """ 测试运行中直接设置运动策略后策略生效. """
+        calls = []
+
+        class CountPolicy(MovePolicy):
+            def access(self, others):
+                calls.append(self.parent.env.time_info[0])
+
+        env = Environment()
+        obj = env.add(MoveEntity(pos=[0, 0], vel=[1, 0]))
+        policy = CountPolicy()
+        policy.parent = obj
+        env.step_events.append(EventScheduler(evt=lambda e: setattr(obj, 'policy', policy), times=[0.5]))
+        env.run(stop=1.0, step=0.1)
+        self.assertEqual(len(calls), 5)
@@ -0,0 +1,74 @@
+import unittest
+import numpy as np
+from sim import Environment
+from sim.vec import vec, dist, unit
+from sim.move import MoveEntity, MovePolicy
+from sim.interact import PairwiseForce, gravity, separation
+
+G = 1.0e3
+
+
+class GravityPolicy(MovePolicy):
+    """ 引力策略（同 examples/multi_body.py）. """
+
+    def access(self, others):
+        f0 = vec([0, 0])
+        _, dt = self.parent.env.time_info
+        for obj in others:
+            r = dist(self.parent.pos, obj.pos)
+            f = unit(obj.pos - self.parent.pos) * G * obj.m / (r ** 2)
+            f0 = f0 + f
+        self.parent.vel += f0 * dt
+
+
+class TestInteract(unittest.TestCase):
+    def test_gravity(self):
+        """ 测试成对引力与逐对策略结果一致. """
+        rng = np.random.default_rng(0)
+        pts = rng.uniform(-100, 100, (8, 2))
+        results = []
+        for engine in [False, True]:
+            env = Environment()
+            kwargs = [{} if engine else {'policy': GravityPolicy()} for _ in pts]
+            objs = [env.add(MoveEntity(props={'m': 1.0 + i}, pos=p, vel=[0, 0], **kw))
+                    for i, (p, kw) in enumerate(zip(pts, kwargs))]
+            if engine:
+                env.add(PairwiseForce(gravity(G)))
+            env.run(stop=2.0)
+            results.append(np.array([obj.pos for obj in objs]))
+        np.testing.assert_almost_equal(results[0], results[1])
+
+    def test_cutoff(self):
+        """ 测试截断距离分块计算与直接计算一致. """
+        rng = np.random.default_rng(1)
+        pos = rng.uniform(-50, 50, (300, 3))
+        masses = np.ones(300)
+        law = separation(radius=8.0, k=2.0)
+        dense = PairwiseForce(law, chunk=64).accelerations(pos, masses)
+        grid = PairwiseForce(law, cutoff=8.0).accelerations(pos, masses)
+        self.assertTrue(np.abs(dense).max() > 0)
+        np.testing.assert_almost_equal(dense, grid)
+
+    def test_own_step_member(self):
+        """ 重写 step 的运动实体不能作为成员. """
+        class Damped(MoveEntity):
+            def step(self, time_info):
+                self.vel = self.vel * 0.99
+                super().step(time_info)
+
+        env = Environment()
+        a = env.add(MoveEntity(pos=[0, 0]))
+        b = env.add(Damped(pos=[10, 0]))
+        env.add(PairwiseForce(gravity(G), members=[a, b]))
+        with self.assertRaises(ValueError):
+            env.run(stop=1.0)
+
+        # 默认成员只包含状态存储中的实体.
+        env = Environment()
+        a = env.add(MoveEntity(pos=[0, 0]))
+        c = env.add(MoveEntity(pos=[0, 10]))
+        b = env.add(Damped(pos=[10, 0]))
+        env.add(PairwiseForce(gravity(G)))
+        env.run(stop=1.0)
+        np.testing.assert_almost_equal(b.pos, [10, 0])
+        self.assertLess(c.vel[1], 0.0)
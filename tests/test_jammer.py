@@ -0,0 +1,108 @@
+import unittest
+import numpy as np
+from sim import Environment
+from sim.common import Uav, Jammer, UavFleet
+from sim.common.fleet import FleetUav
+from sim.common.rules import rule_uav_jammer
+from sim.common.uav import UavState
+
+
+class TestJammer(unittest.TestCase):
+    def test_coverage(self):
+        """ 测试覆盖判断：全局、几何、栅格. """
+        uav = Uav(track=[[0, 0], [10, 0]])
+        jammer = Jammer(kind='gps')
+        self.assertIsNone(rule_uav_jammer(uav, jammer))
+        jammer.power_on = True
+        self.assertEqual(rule_uav_jammer(uav, jammer), ('gps', 1))
+
+        jammer = Jammer(pos=[100, 0], range=50.0, power_on=True)
+        self.assertIsNone(rule_uav_jammer(uav, jammer))
+        uav.position = np.array([60.0, 10.0])
+        self.assertEqual(rule_uav_jammer(uav, jammer), ('jam', 1))
+
+        pts = np.random.default_rng(0).uniform(-100, 100, (2000, 2))
+        sector = Jammer(pos=[0, 0], range=80.0, a_range=[0, 90])
+        exact = sector.covers_batch(pts)
+        self.assertTrue(exact[np.argmin(np.linalg.norm(pts - [20, 20], axis=1))])
+        self.assertFalse(exact[np.argmin(np.linalg.norm(pts - [-20, 20], axis=1))])
+
+        raster = Jammer(pos=[0, 0], range=80.0, a_range=[0, 90], raster=1.0)
+        self.assertIsNone(raster.coverage())
+        raster.power_on = True
+        self.assertEqual(raster.coverage().shape, (161, 161))
+        fast = raster.covers_batch(pts)
+        # 栅格只在覆盖边界附近（一个网格内）与几何判断不同.
+        r = np.linalg.norm(pts, axis=1)
+        edge = (np.abs(r - 80.0) < 1.5) | (np.abs(pts[:, 0]) < 1.5) | (np.abs(pts[:, 1]) < 1.5)
+        np.testing.assert_array_equal(fast[~edge], exact[~edge])
+        self.assertEqual([raster.covers(p) for p in pts[:50]], fast[:50].tolist())
+
+        # 三维：栅格只在水平面上，高度解析判断.
+        pts = np.random.default_rng(1).uniform(-1200, 1200, (5000, 3))
+        exact = Jammer(pos=[0, 0, 50], range=1000.0, a_range=[30, 200]).covers_batch(pts)
+        raster = Jammer(pos=[0, 0, 50], range=1000.0, a_range=[30, 200], raster=10.0, power_on=True)
+        self.assertEqual(raster.coverage().shape, (201, 201))
+        fast = raster.covers_batch(pts)
+        d = pts - [0, 0, 50]
+        a = np.degrees(np.arctan2(d[:, 0], d[:, 1])) % 360
+        edge = (np.abs(np.linalg.norm(d, axis=1) - 1000.0) < 15.0) \
+            | (np.minimum(np.abs(a - 30), np.abs(a - 200)) * np.pi / 180 * np.linalg.norm(d[:, :2], axis=1) < 15.0)
+        self.assertTrue(exact[~edge].any())
+        np.testing.assert_array_equal(fast[~edge], exact[~edge])
+        self.assertEqual([raster.covers(p) for p in pts[:50]], fast[:50].tolist())
+        with self.assertRaises(ValueError):
+            Jammer(pos=[0, 0, 0], range=1.0e5, raster=1.0, power_on=True)
+
+    def test_mixed_dims(self):
+        """ 测试干扰机与无人机位置维度不同时只比较水平坐标. """
+        rng = np.random.default_rng(2)
+        pts3 = rng.uniform(-100, 100, (2000, 3)) * [1, 1, 10]
+        pts2 = pts3[:, :2]
+        r = np.linalg.norm(pts2, axis=1)
+        a = np.degrees(np.arctan2(pts2[:, 0], pts2[:, 1])) % 360
+        expected = (r <= 80.0) & (a <= 90.0)
+        edge = (np.abs(r - 80.0) < 1.5) | (np.abs(pts2[:, 0]) < 1.5) | (np.abs(pts2[:, 1]) < 1.5)
+
+        # 二维干扰机、三维无人机：几何判断.
+        flat = Jammer(pos=[0, 0], range=80.0, a_range=[0, 90])
+        np.testing.assert_array_equal(flat.covers_batch(pts3), expected)
+        self.assertEqual([flat.covers(p) for p in pts3[:50]], expected[:50].tolist())
+
+        # 二维干扰机、三维无人机：栅格判断.
+        flat = Jammer(pos=[0, 0], range=80.0, a_range=[0, 90], raster=1.0, power_on=True)
+        fast = flat.covers_batch(pts3)
+        np.testing.assert_array_equal(fast[~edge], expected[~edge])
+        self.assertEqual([flat.covers(p) for p in pts3[:50]], fast[:50].tolist())
+
+        # 三维干扰机、二维无人机：几何与栅格判断一致.
+        exact = Jammer(pos=[0, 0, 500], range=80.0, a_range=[0, 90])
+        raster = Jammer(pos=[0, 0, 500], range=80.0, a_range=[0, 90], raster=1.0, power_on=True)
+        np.testing.assert_array_equal(exact.covers_batch(pts2), expected)
+        fast = raster.covers_batch(pts2)
+        np.testing.assert_array_equal(fast[~edge], expected[~edge])
+        self.assertEqual([exact.covers(p) for p in pts2[:50]], expected[:50].tolist())
+        self.assertEqual([raster.covers(p) for p in pts2[:50]], fast[:50].tolist())
+
+    def test_fleet(self):
+        """ 测试机群批量干扰判断与逐架 Uav 一致. """
+        rng = np.random.default_rng(1)
+        tracks = [[[x, -100], [x, 100]] for x in rng.uniform(-100, 100, 30)]
+        histories = []
+        for fleet in (False, True):
+            env = Environment()
+            if fleet:
+                env.add(UavFleet(tracks, speed=5.0))
+            else:
+                env.add_many(Uav(track=t, speed=5.0) for t in tracks)
+            env.add(Jammer(pos=[50, 0], range=60.0, raster=2.0, power_on=True))
+            env.add(Jammer(kind='gps', pos=[-50, 0], range=40.0, power_on=True))
+            uavs = [obj for obj in env.children if isinstance(obj, (Uav, FleetUav))]
+            history = []
+            env.step_events.append(lambda env: history.append(
+                [u.control.state if isinstance(u, Uav) else u.state for u in uavs]))
+            env.run(stop=35)
+            histories.append(history)
+        self.assertEqual(histories[0], histories[1])
+        visited = {s for states in histories[1] for s in states}
+        self.assertTrue({UavState.FLY, UavState.HOVER, UavState.RETURN, UavState.OVER} <= visited)
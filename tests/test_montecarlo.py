@@ -0,0 +1,31 @@
+import unittest
+from sim import Environment, EventScheduler
+from sim.move import MoveEntity
+from sim.recorder import EntityPropRecorder
+from sim.montecarlo import run_replicas
+
+
+def build(seed):
+    env = Environment()
+    obj = env.add(MoveEntity(pos=[0, 0], vel=[1, 0]))
+
+    def kick(e):
+        obj.vel = obj.vel + [0, e.random.random()]
+
+    env.step_events.append(EventScheduler(evt=kick, rand=[0.2, 1.0]))
+    env.step_events.append(EntityPropRecorder(obj, 'pos', columnar=True))
+    return env
+
+
+class TestMonteCarlo(unittest.TestCase):
+    def test_replicas(self):
+        """ 测试副本按种子可复现. """
+        serial = run_replicas(build, seeds=[1, 2, 1], processes=1, stop=5.0)
+        self.assertTrue((serial[0][0] == serial[2][0]).all())
+        self.assertFalse((serial[0][0] == serial[1][0]).all())
+
+        parallel = run_replicas(build, seeds=[1, 2, 1], processes=2, stop=5.0)
+        for a, b in zip(serial, parallel):
+            self.assertTrue((a[0] == b[0]).all())
+        with self.assertRaises(ValueError):
+            run_replicas(build, seeds=[1], processes=1, stop=5.0, seed=3)
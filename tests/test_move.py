@@ -49,6 +49,25 @@ class TestMove(unittest.TestCase):
         xyz2 = move.aer_to_xyz(aer, angle='d')
         np.testing.assert_almost_equal(xyz, xyz2)
 
+    def test_xyz_aer_batch(self):
+        """ 测试批量坐标转换与单点转换结果一致. """
+        rng = np.random.default_rng(0)
+        xyz = rng.uniform(-100, 100, (50, 3))
+        origin = vec.vec([1, 2, 3])
+
+        for angle in ['d', 'r']:
+            aer = move.xyz_to_aer_batch(xyz, origin, angle=angle)
+            for pt, ret in zip(xyz, aer):
+                np.testing.assert_almost_equal(ret, move.xyz_to_aer(pt, origin, angle=angle))
+            np.testing.assert_almost_equal(move.aer_to_xyz_batch(aer, origin, angle=angle), xyz)
+
+        origins = rng.uniform(-10, 10, (50, 3))
+        aer = move.xyz_to_aer_batch(xyz, origins)
+        np.testing.assert_almost_equal(aer[7], move.xyz_to_aer(xyz[7], origins[7]))
+
+        aer = move.xyz_to_aer_ex_batch(xyz, origin, [30, 10])
+        np.testing.assert_almost_equal(aer[3], move.xyz_to_aer_ex(xyz[3], origin, [30, 10]))
+
     def test_move_to(self):
         """ 测试移动函数.
         1. move_to
@@ -68,6 +87,75 @@ class TestMove(unittest.TestCase):
         np.testing.assert_almost_equal(pt2, vec.vec([0, 1]))
         self.assertAlmostEqual(d, -0.5)
 
+    def test_move_out(self):
+        """ 测试原地移动.
+        1. move_to
+        2. move_on_track
+        """
+        pos = vec.vec([0, 0])
+        ret, d = move.move_to(pos, vec.vec([0, 2]), 0.5, out=pos)
+        self.assertTrue(ret is pos)
+        np.testing.assert_almost_equal(pos, [0, 0.5])
+        self.assertAlmostEqual(d, 1.5)
+
+        track = move.Track(track=[[0, 0], [0, 1], [1, 1]])
+        start = track.start()
+        pos = start.copy()
+        ret = move.move_on_track(pos, track, 1.5, out=pos)
+        self.assertTrue(ret is pos)
+        np.testing.assert_almost_equal(pos, [0.5, 1])
+        np.testing.assert_almost_equal(track.waypoints[1], [0, 1])
+        np.testing.assert_almost_equal(start, [0, 0])
+
+    def test_track_arc(self):
+        """ 测试航线弧长索引.
+        1. 大步长 move_on_track 与逐航段小步移动结果一致
+        2. TrackBatch 与逐条航线 position_at 一致
+        """
+        rng = np.random.default_rng(0)
+        pts = rng.uniform(-10, 10, (50, 3))
+        pts[5] = pts[4]  # 零长度航段.
+        track = move.Track(track=pts)
+        np.testing.assert_almost_equal(track.arc[-1], np.sum(np.linalg.norm(np.diff(pts, axis=0), axis=1)))
+        pos = track.start().copy()
+        move.move_on_track(pos, track, 30.0, out=pos)
+        fine = move.Track(track=pts)
+        pos1 = fine.start().copy()
+        for _ in range(300):
+            move.move_on_track(pos1, fine, 0.1, out=pos1)
+        np.testing.assert_almost_equal(pos, pos1)
+        self.assertEqual(track.wp_index, fine.wp_index)
+        np.testing.assert_almost_equal(pos, track.position_at(30.0))
+
+        move.move_on_track(pos, track, 1e6, out=pos)
+        self.assertTrue(track.is_over())
+        np.testing.assert_almost_equal(pos, pts[-1])
+
+        tracks = [move.Track(track=rng.uniform(-10, 10, (n, 2))) for n in (2, 5, 30)]
+        batch = move.TrackBatch(tracks + tracks[:1])
+        s = np.array([1.0, 7.5, 40.0, 1e3])
+        positions, index = batch.positions_at(s)
+        for k, t in enumerate(tracks + tracks[:1]):
+            np.testing.assert_almost_equal(positions[k], t.position_at(s[k]))
+            self.assertEqual(index[k], t.index_at(s[k]))
+        np.testing.assert_almost_equal(tracks[2].positions_at(s), [tracks[2].position_at(v) for v in s])
+
+    def test_track_invalidate(self):
+        """ 测试航点修改后弧长预计算失效. """
+        track = move.Track(track=[[0, 0], [10, 0]])
+        self.assertAlmostEqual(track.length, 10.0)
+
+        # 原地修改航点后调用 invalidate.
+        track.waypoints[1][0] = 20.0
+        track.invalidate()
+        self.assertAlmostEqual(track.length, 20.0)
+        np.testing.assert_almost_equal(track.position_at(15.0), [15, 0])
+
+        # 整体替换为航点数相同的列表.
+        track.waypoints = [vec.vec([0, 0]), vec.vec([0, 5])]
+        self.assertAlmostEqual(track.length, 5.0)
+        np.testing.assert_almost_equal(track.position_at(3.0), [0, 3])
+
     def test_in_range(self):
         self.assertTrue(move.in_range(2, [1, 3]))
         self.assertTrue(move.in_range(2, [None, 3]))
@@ -1,6 +1,7 @@
 import unittest
-from sim import vec, move
-from sim.common.radar import Fov
+import numpy as np
+from sim import vec, move, Entity, Environment, EventScheduler
+from sim.common.radar import Fov, Radar, ResultManager, RadarResult
 
 
 class TestFov(unittest.TestCase):
@@ -25,3 +26,77 @@ class TestFov(unittest.TestCase):
         self.assertTrue(ret is not None)
         print(ret)
 
+
+
+class TestRadar(unittest.TestCase):
+    def test_detect_batch(self):
+        """ 测试批量探测与逐目标探测结果一致. """
+        radar = Radar(pos=[0, 0, 0], out='aer', r_range=[None, 150], a_range=[0, 180], e_range=[0, 60])
+        rng = np.random.default_rng(0)
+        targets = []
+        for pt in rng.uniform(-200, 200, (100, 3)):
+            target = Entity()
+            target.position = pt
+            targets.append(target)
+        targets.append(Entity())
+
+        rets = radar.sensor.detect_batch(targets)
+        expected = {}
+        for target in targets[:-1]:
+            ret = radar.sensor.detect(target)
+            if ret is not None:
+                expected[target.id] = ret
+        self.assertTrue(len(expected) > 0)
+        self.assertEqual(set(rets.keys()), set(expected.keys()))
+        for k, v in expected.items():
+            np.testing.assert_almost_equal(rets[k], v)
+
+    def test_event_advance(self):
+        """ 测试事件推进时雷达刷新时间与固定步长推进一致. """
+        histories = []
+        for advance in ('fixed', 'event'):
+            env = Environment()
+            env.add(Radar(pos=[0, 0, 0], out='aer', r_range=[None, 500], rate=1.0, remove=3.0))
+            for pt in [[100, 50, 30], [-80, 120, 40], [10, -200, 60]]:
+                target = env.add(Entity())
+                target.position = np.array(pt, dtype=np.float64)
+            history = set()
+            env.step_events.append(EventScheduler(evt=lambda e: None, times=[3.3, 7.55]))
+            env.step_events.append(lambda e, h=history: h.update(
+                (v.bid, v.time, v.count) for v in e.children[0].results.values()))
+            env.run(stop=12.0, step=0.1, advance=advance)
+            histories.append(history)
+        self.assertEqual(histories[0], histories[1])
+        self.assertEqual(max(count for _, _, count in histories[0]), 12)
+
+
+class TestResultManager(unittest.TestCase):
+    def test_accept(self):
+        """ 测试结果合并、过期与最新结果查询与逐个扫描的语义一致. """
+        recv, remove = 1.0, 3.0
+        mgr = ResultManager(rate=recv, remove=remove)
+        expected, batch_id = {}, 0
+        rng = np.random.default_rng(1)
+        for k in range(200):
+            t = k * 0.5
+            ids = rng.choice(20, size=rng.integers(0, 8), replace=False)
+            curr = {int(i): float(i) + t for i in ids}
+            mgr.accept(curr, t)
+
+            for obj_id, ret in curr.items():
+                if obj_id in expected:
+                    bid, tp, count, _ = expected[obj_id]
+                    if t - tp >= recv:
+                        expected[obj_id] = RadarResult(bid, t, count + 1, ret)
+                else:
+                    batch_id += 1
+                    expected[obj_id] = RadarResult(batch_id, t, 1, ret)
+            expected = {k: v for k, v in expected.items() if t - v.time < remove}
+
+            self.assertEqual(mgr.results(), expected)
+            self.assertEqual(mgr.current_results(t), {k: v for k, v in expected.items() if v.time == t})
+            self.assertEqual(mgr.current_results(t - 0.5), {k: v for k, v in expected.items() if v.time == t - 0.5})
+
+        mgr.reset()
+        self.assertEqual(mgr.results(), {})
+        self.assertEqual(mgr.current_results(t), {})
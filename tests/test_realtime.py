@@ -0,0 +1,48 @@
+import unittest
+from sim import Environment
+from sim.realtime import Pacer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, dt):
+        self.now += dt
+
+
+class TestPacer(unittest.TestCase):
+    def run_pacer(self, overrun):
+        clock = FakeClock()
+        pacer = Pacer(overrun=overrun, clock=clock, sleep=clock.sleep)
+        pacer.start(0.0)
+        starts = []
+        for i, cost in enumerate([0.01, 0.35, 0.01, 0.01, 0.01]):
+            pacer.wait(i * 0.1)
+            starts.append(round(clock.now, 6))
+            clock.now += cost
+        pacer.finish()
+        return pacer, starts
+
+    def test_catchup(self):
+        pacer, starts = self.run_pacer('catchup')
+        self.assertEqual(starts, [0.0, 0.1, 0.45, 0.46, 0.47])
+        self.assertEqual(pacer.overruns, 3)
+        self.assertAlmostEqual(max(pacer.lateness), 0.25)
+        self.assertAlmostEqual(pacer.stats()['duration_max'], 0.35)
+
+    def test_skip(self):
+        pacer, starts = self.run_pacer('skip')
+        self.assertEqual(starts, [0.0, 0.1, 0.45, 0.55, 0.65])
+        self.assertEqual(pacer.overruns, 1)
+
+    def test_env(self):
+        env = Environment()
+        env.run(stop=0.5, step=0.1, realtime=True, speed=20.0)
+        stats = env.pacer.stats()
+        self.assertEqual(stats['steps'], 6)
+        env.run(realtime=False)
+        self.assertTrue(env.pacer is None)
@@ -0,0 +1,114 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from sim import Environment
+from sim.move import MoveEntity
+from sim.recorder import ArrayColumn, PropRecorder, EntityPropRecorder, StreamRecorder, StreamReader
+
+
+class TestRecorder(unittest.TestCase):
+    def test_column(self):
+        """ 测试列式存储. """
+        col = ArrayColumn(chunk=4)
+        for i in range(10):
+            col.append(i * 0.1, [i, -i])
+        self.assertEqual(len(col), 10)
+        self.assertEqual(col.values().shape, (10, 2))
+        np.testing.assert_almost_equal(col.values()[9], [9, -9])
+        np.testing.assert_almost_equal(col.times()[-1], 0.9)
+        with self.assertRaises(ValueError):
+            col.append(1.0, [1, 2, 3])
+        col.append(1.0, [10, -10])
+        col.append(1.1, [11, -11])
+        # 块边界处同样检查形状.
+        with self.assertRaises(ValueError):
+            col.append(1.2, [1, 2, 3])
+        with self.assertRaises(TypeError):
+            col.append(1.2, ['a', 'b'])
+        self.assertEqual(col.values().shape, (12, 2))
+
+    def test_columnar_recorder(self):
+        """ 测试列式记录与列表记录结果一致. """
+        env = Environment()
+        obj = env.add(MoveEntity(pos=[0, 0], vel=[1, 2]))
+        rec1 = PropRecorder('pos')
+        rec2 = PropRecorder('pos', columnar=True, chunk=16)
+        rec3 = EntityPropRecorder(obj.id, 'pos', columnar=True)
+        env.step_events.extend([rec1, rec2, rec3])
+        env.run(stop=5.0)
+
+        np.testing.assert_almost_equal(np.array(rec1.records[obj.id]), rec2.records[obj.id])
+        np.testing.assert_almost_equal(rec3.records, rec2.records[obj.id])
+        self.assertEqual(len(rec2.times[obj.id]), 51)
+
+        with tempfile.TemporaryDirectory() as path:
+            rec2.save(path)
+            values = np.load(os.path.join(path, f'{obj.id}.npy'), mmap_mode='r')
+            np.testing.assert_almost_equal(values, rec2.records[obj.id])
+            rec3.save(os.path.join(path, 'a.npz'))
+            with np.load(os.path.join(path, 'a.npz')) as data:
+                np.testing.assert_almost_equal(data[f'{obj.id}_t'], rec3.times)
+
+    def test_stream_recorder(self):
+        """ 测试流式记录落盘与按实体、时间读取. """
+        env = Environment()
+        objs = [env.add(MoveEntity(pos=[i, 0], vel=[1, i])) for i in range(3)]
+        rec1 = PropRecorder('pos', columnar=True)
+        with tempfile.TemporaryDirectory() as path:
+            path = os.path.join(path, 'pos.rec')
+            rec2 = StreamRecorder('pos', path, buffer=7)
+            env.step_events.extend([rec1, rec2])
+            env.run(stop=5.0)
+            self.assertLessEqual(rec2._count, 7)
+            rec2.close()
+
+            reader = StreamReader(path)
+            self.assertEqual(reader.prop_name, 'pos')
+            self.assertEqual(reader.ids, sorted(obj.id for obj in objs))
+            self.assertEqual(len(reader), 3 * 51)
+            for obj in objs:
+                times, values = reader.read(obj.id)
+                np.testing.assert_almost_equal(times, rec1.times[obj.id])
+                np.testing.assert_almost_equal(values, rec1.records[obj.id])
+
+                times, values = reader.read(obj.id, 1.0, 2.0)
+                mask = (rec1.times[obj.id] >= 1.0) & (rec1.times[obj.id] <= 2.0)
+                np.testing.assert_almost_equal(values, rec1.records[obj.id][mask])
+
+            # 追加写入，并忽略不完整的最后一块.
+            with StreamRecorder('pos', path, append=True) as rec3:
+                rec3(env)
+            with open(path, 'ab') as f:
+                f.write(b'BLCK\0\0')
+            reader = StreamReader(path)
+            self.assertEqual(len(reader), 3 * 52)
+            with self.assertRaises(ValueError):
+                StreamRecorder('vel', path, append=True)
+
+            # 中断后追加：截去不完整的块，之前的完整块和新块均可读取.
+            with StreamRecorder('pos', path, append=True) as rec3:
+                rec3(env)
+            with open(path, 'r+b') as f:
+                f.truncate(os.path.getsize(path) - 20)
+            self.assertEqual(len(StreamReader(path)), 3 * 52)
+            with StreamRecorder('pos', path, append=True) as rec3:
+                rec3(env)
+            reader = StreamReader(path)
+            self.assertEqual(len(reader), 3 * 53)
+            times, values = reader.read(objs[1].id)
+            np.testing.assert_almost_equal(values[-1], objs[1].pos)
+
+            # 实体数超过缓冲行数：每步一块，实体 id 只在第一块写入.
+            env = Environment()
+            objs = env.add_many(MoveEntity(pos=[i, 0], vel=[1, i]) for i in range(50))
+            with StreamRecorder('pos', path, buffer=10) as rec4:
+                env.step_events.append(rec4)
+                env.run(stop=1.0)
+            reader = StreamReader(path)
+            self.assertEqual(len(reader._index), 11)
+            self.assertEqual(len(reader), 50 * 11)
+            self.assertLess(os.path.getsize(path), 50 * 11 * 8 * 3)
+            times, values = reader.read(objs[7].id)
+            np.testing.assert_almost_equal(values[-1], objs[7].pos)
+            self.assertEqual(len(times), 11)
@@ -0,0 +1,113 @@
+import unittest
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import numpy as np
+from sim.common import Uav, Jammer
+from sim.recorder import StreamReader
+from sim.__main__ import main
+from sim.scenario import Scenario, load
+
+SPEC = {
+    'env': {'stop': 10.0},
+    'entities': [
+        {'type': 'move', 'name': 'earth', 'props': {'m': 2}, 'pos': [-100, 0], 'vel': [0, -1]},
+        {'type': 'move', 'name': 'moon', 'props': {'m': 1}, 'pos': [100, 0], 'vel': [0, 1]},
+        {'type': 'pairwise_force', 'law': {'type': 'gravity', 'G': 1000.0}, 'members': ['earth', 'moon']},
+        {'type': 'uav', 'name': 'uav1', 'track': [[0, 0], [100, 0]], 'speed': 2.5},
+        {'type': 'jammer', 'name': 'gps1', 'kind': 'gps'},
+    ],
+    'events': [{'target': 'gps1', 'toggle': 'power_on', 'times': [3, 5]}],
+    'record': [{'prop': 'pos'}, {'prop': 'position', 'mode': 'stream'}],
+}
+
+
+class TestScenario(unittest.TestCase):
+    def test_build(self):
+        """ 测试根据场景描述构建与运行. """
+        with tempfile.TemporaryDirectory() as out:
+            scenario = Scenario(SPEC, out=out)
+            env = scenario.env
+            self.assertEqual(len(env.children), 5)
+            self.assertIsInstance(env.find('uav1'), Uav)
+            self.assertIsInstance(env.find('gps1'), Jammer)
+
+            stats = scenario.run()
+            self.assertEqual(stats['steps'], env.ticks)
+            self.assertEqual(stats['entities'], 5)
+            # 第 3 s 打开 GPS 干扰后悬停，第 5 s 关闭后继续飞行.
+            uav = env.find('uav1')
+            self.assertAlmostEqual(uav.position[0], 2.5 * 8.0, delta=0.6)
+            self.assertFalse(env.find('gps1').power_on)
+
+            scenario.save(out)
+            with np.load(os.path.join(out, 'pos.npz')) as data:
+                earth = env.find('earth')
+                np.testing.assert_almost_equal(data[str(earth.id)][-1], earth.pos)
+            times, values = StreamReader(os.path.join(out, 'position.rec')).read(uav.id)
+            np.testing.assert_almost_equal(values[-1], uav.position)
+
+    def test_cli(self):
+        """ 测试命令行运行 YAML/JSON 场景文件，且不导入绘图模块. """
+        spec = dict(SPEC, record=[{'prop': 'pos'}])
+        with tempfile.TemporaryDirectory() as path:
+            json_path = os.path.join(path, 'a.json')
+            with open(json_path, 'w') as f:
+                json.dump(spec, f)
+            yaml_path = os.path.join(path, 'b.yaml')
+            with open(yaml_path, 'w') as f:
+                f.write('env: {stop: 2.0}\nentities:\n  - type: uav\n    track: [[0, 0], [10, 0]]\n')
+            self.assertEqual(len(load(yaml_path).env.children), 1)
+
+            out = os.path.join(path, 'out')
+            code = ('import sys; from sim.__main__ import main; '
+                    f'main([{json_path!r}, {yaml_path!r}, "-o", {out!r}, "-q"]); '
+                    'assert "sim.plot" not in sys.modules')
+            root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            subprocess.run([sys.executable, '-c', code], check=True, cwd=root)
+            with open(os.path.join(out, 'a', 'summary.json')) as f:
+                self.assertGreater(json.load(f)['steps'], 0)
+            self.assertTrue(os.path.exists(os.path.join(out, 'a', 'pos.npz')))
+            self.assertTrue(os.path.exists(os.path.join(out, 'b', 'summary.json')))
+
+            # 流式记录未指定输出目录时给出用法错误.
+            spec['record'] = [{'prop': 'pos', 'mode': 'stream'}]
+            with open(json_path, 'w') as f:
+                json.dump(spec, f)
+            ret = subprocess.run([sys.executable, '-m', 'sim', json_path], cwd=root, capture_output=True, text=True)
+            self.assertEqual(ret.returncode, 2)
+            self.assertIn('pass -o OUT', ret.stderr)
+            self.assertNotIn('Traceback', ret.stderr)
+
+    def test_errors(self):
+        """ 测试场景描述错误时抛出 ValueError，命令行给出用法错误而非异常栈. """
+        entities = [{'type': 'move', 'name': 'a'}]
+        bad_specs = [
+            {'entities': entities, 'events': [{'toggle': 'power_on', 'times': [1]}]},
+            {'entities': entities, 'record': [{'mode': 'columnar'}]},
+            {'entities': entities, 'record': [{'prop': 'pos'}, {'prop': 'pos'}]},
+            {'entities': [{'type': 'pairwise_force', 'cutoff': 1.0}]},
+            {'entities': [{'type': 'no_such_type'}]},
+        ]
+        for spec in bad_specs:
+            with self.assertRaises(ValueError):
+                Scenario(spec)
+
+        with tempfile.TemporaryDirectory() as path:
+            yaml_path = os.path.join(path, 'bad.yaml')
+            with open(yaml_path, 'w') as f:
+                f.write('entities: [\n')
+            json_path = os.path.join(path, 'bad.json')
+            with open(json_path, 'w') as f:
+                json.dump({'entities': [{'type': 'pairwise_force', 'cutoff': 1.0}]}, f)
+            for p in [os.path.join(path, 'missing.json'), yaml_path, json_path]:
+                stderr = io.StringIO()
+                with contextlib.redirect_stderr(stderr), self.assertRaises(SystemExit) as cm:
+                    main([p, '-q'])
+                self.assertEqual(cm.exception.code, 2)
+                self.assertIn(p, stderr.getvalue())
+                self.assertNotIn('pass -o', stderr.getvalue())
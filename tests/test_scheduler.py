@@ -1,5 +1,10 @@
 import unittest
+import random
+from functools import partial
+import numpy as np
 from sim import Environment, EventScheduler
+from sim.move import MoveEntity
+from sim.common import Uav, Jammer
 
 
 class Counter:
@@ -36,3 +41,48 @@ class TestScheduler(unittest.TestCase):
         env.step_events.append(EventScheduler(evt=counter, rand=[0.1, 1]))
         env.run()
         self.assertTrue(counter.value > 10)
+
+    def test_scheduler_queue(self):
+        """ 测试事件队列调度与逐步轮询结果一致. """
+        def make():
+            return [EventScheduler(dt=0.3), EventScheduler(dt=0.05), EventScheduler(times=[0.5, 2, 2.05, 7]),
+                    EventScheduler(times=[1, 2]), EventScheduler(rand=[0.2, 0.8])]
+
+        records = []
+        for queued in [True, False]:
+            random.seed(1)
+            env = Environment()
+            calls = []
+            for i, sch in enumerate(make()):
+                sch.evt = partial(lambda e, k: calls.append((k, round(e.time_info[0], 6))), k=i)
+                env.step_events.append(sch if queued else partial(lambda e, s: s(e), s=sch))
+            env.run()
+            env.run(stop=5.0)
+            records.append(calls)
+        self.assertEqual(records[0], records[1])
+
+    def test_event_advance(self):
+        """ 测试事件推进模式与固定步长结果一致. """
+        results = []
+        for advance in ['fixed', 'event']:
+            env = Environment()
+            obj = env.add(MoveEntity(pos=[0, 0], vel=[1, 2]))
+            jammer = env.add(Jammer(kind='gps'))
+            uav = env.add(Uav(track=[[0, 0], [100, 0]], speed=2.0, life=12.0))
+            fired, ticks = [], Counter()
+
+            def switch(e):
+                jammer.power_on = not jammer.power_on
+                fired.append(round(e.time_info[0], 6))
+
+            env.step_events.append(EventScheduler(evt=switch, times=[2, 5.05, 7]))
+            env.step_events.append(ticks)
+            env.run(stop=20.0, advance=advance)
+            results.append((fired, obj.pos.copy(), uav.position.copy(), uav.control.state, ticks.value))
+
+        fixed, event = results
+        self.assertEqual(fixed[0], event[0])
+        np.testing.assert_almost_equal(fixed[1], event[1])
+        np.testing.assert_almost_equal(fixed[2], event[2])
+        self.assertEqual(fixed[3], event[3])
+        self.assertTrue(event[4] < fixed[4] / 2)
@@ -0,0 +1,66 @@
+import unittest
+import copy
+import numpy as np
+from sim import Environment
+from sim.move import MoveEntity
+from sim.store import StateBlock
+
+
+class TestStore(unittest.TestCase):
+    def test_block(self):
+        """ 测试状态块分配、释放与扩容. """
+        block = StateBlock(2, capacity=2)
+        slots = [block.alloc() for _ in range(5)]
+        self.assertEqual(len(set(slots)), 5)
+        self.assertTrue(block.capacity >= 5)
+
+        block.vel[slots] = 1.0
+        block.release(slots[1])
+        block.integrate(0.5)
+        np.testing.assert_almost_equal(block.pos[slots[0]], [0.5, 0.5])
+        np.testing.assert_almost_equal(block.pos[slots[1]], [0.0, 0.0])
+        self.assertEqual(block.count, 4)
+
+    def test_move_entity(self):
+        """ 测试运动实体在环境中统一积分. """
+        env = Environment()
+        obj1 = env.add(MoveEntity(pos=[0, 0], vel=[1, 0]))
+        obj2 = env.add(MoveEntity(pos=[0, 0, 0], vel=[0, 0, 2]))
+        self.assertTrue(obj1._block is not None)
+
+        env.run(stop=1.0, step=0.1)
+        np.testing.assert_almost_equal(obj1.pos, [1.1, 0])
+        np.testing.assert_almost_equal(obj2.pos, [0, 0, 2.2])
+        np.testing.assert_almost_equal(obj1.pos0, [0, 0])
+
+        obj3 = copy.deepcopy(obj1)
+        obj3.pos += 1.0
+        np.testing.assert_almost_equal(obj1.pos, [1.1, 0])
+
+        env.remove(obj1)
+        self.assertTrue(obj1._block is None)
+        np.testing.assert_almost_equal(obj1.pos, [1.1, 0])
+        obj1.step((0, 1.0))
+        np.testing.assert_almost_equal(obj1.pos, [2.1, 0])
+
+    def test_own_step(self):
+        """ 测试重写 step 的运动实体不使用状态存储，只积分一次；统一积分的实体不参与逐实体步进. """
+        class Ballistic(MoveEntity):
+            def step(self, time_info):
+                _, dt = time_info
+                self.vel = self.vel + dt * np.array([0.0, -1.0])
+                super().step(time_info)
+
+        env = Environment()
+        obj = env.add(Ballistic(pos=[0, 0], vel=[1, 0]))
+        mover = env.add(MoveEntity(pos=[0, 0], vel=[1, 0]))
+        self.assertIsNone(obj._block)
+        self.assertTrue(obj.has_step())
+        self.assertFalse(mover.has_step())
+        env.run(stop=1.0, step=0.1)
+
+        ref = Ballistic(pos=[0, 0], vel=[1, 0])
+        for _ in range(11):
+            ref.step((0, 0.1))
+        np.testing.assert_almost_equal(obj.pos, ref.pos)
+        np.testing.assert_almost_equal(mover.pos, [1.1, 0])
@@ -0,0 +1,102 @@
+import unittest
+from functools import partial
+import numpy as np
+from sim import Entity, Environment, EventScheduler
+from sim.common import Uav, Jammer, Radar, UavFleet
+from sim.common.fleet import FleetUav
+from sim.common.rules import applies_to, dispatch, rule_types
+from sim.common.uav import UavState, TRANSITIONS, next_state
+from sim.recorder import PropRecorder
+
+
+def toggle(env, name):
+    jammer = env.find(name)
+    jammer.power_on = not jammer.power_on
+
+
+def build(fleet):
+    rng = np.random.default_rng(0)
+    tracks = [rng.uniform(-50, 50, (rng.integers(2, 6), 3)) + [0, 0, 60] for _ in range(20)]
+    speeds = rng.uniform(1, 5, 20)
+    env = Environment()
+    if fleet:
+        env.add(UavFleet(tracks, speed=speeds, life=25.0))
+    else:
+        env.add_many(Uav(track=t, speed=v, life=25.0) for t, v in zip(tracks, speeds))
+    env.add(Jammer(name='jam'))
+    env.add(Jammer(name='gps', kind='gps'))
+    env.step_events.append(EventScheduler(evt=partial(toggle, name='jam'), times=[3, 4.5]))
+    env.step_events.append(EventScheduler(evt=partial(toggle, name='gps'), times=[6, 7, 8, 9.5]))
+    recorder = PropRecorder('position', alive=False)
+    env.step_events.append(recorder)
+    return env, recorder
+
+
+class TestUavFleet(unittest.TestCase):
+    def test_transitions(self):
+        """ 测试状态转换表与逐条件判断一致. """
+        self.assertEqual(TRANSITIONS[UavState.FLY.value, 0b00010], UavState.HOVER.value)
+        self.assertEqual(TRANSITIONS[UavState.HOVER.value, 0b00010], UavState.RETURN.value)
+        self.assertEqual(TRANSITIONS[UavState.FLY.value, 0], UavState.FLY.value)
+        self.assertEqual(next_state(UavState.OVER, False, False, False, False, False), UavState.OVER)
+
+    def test_fleet(self):
+        """ 测试机群与逐架 Uav 运行结果一致，成员可被雷达探测. """
+        env1, rec1 = build(False)
+        env1.run(stop=40)
+        env2, rec2 = build(True)
+        radar = env2.add(Radar(pos=[0, 0, 0], out='xyz', rate=1.0))
+        states = []
+        detected = set()
+        env2.step_events.append(lambda env: states.append(env.children[0].state.copy()))
+        env2.step_events.append(lambda env: detected.update(radar.results.keys()))
+        env2.run(stop=40)
+
+        uavs = [obj for obj in env1.children if isinstance(obj, Uav)]
+        members = [obj for obj in env2.children if isinstance(obj, FleetUav)]
+        self.assertEqual(len(members), len(uavs))
+        for uav, member in zip(uavs, members):
+            self.assertEqual(uav.control.state, member.state)
+            np.testing.assert_almost_equal(np.array(rec1.records[uav.id]), np.array(rec2.records[member.id]))
+            self.assertEqual(uav.is_alive(), member.is_alive())
+        self.assertEqual([m.is_alive() for m in members], members[0].fleet.alive().tolist())
+        visited = set(np.concatenate(states).tolist())
+        self.assertTrue({UavState.HOVER.value, UavState.RETURN.value} <= visited)
+
+        fleet = env2.children[0]
+        self.assertIs(fleet[3], members[3])
+        self.assertIs(env2.find(members[3].id), members[3])
+        self.assertTrue(detected and detected <= {m.id for m in members})
+        env2.remove(fleet)
+        self.assertEqual(len(env2.children), 3)
+
+
+class TestRules(unittest.TestCase):
+    def test_dispatch(self):
+        """ 测试规则按声明类型接收交互对象. """
+        seen = {'typed': 0, 'untyped': 0}
+
+        @applies_to(Jammer)
+        def typed(uav, other):
+            self.assertIsInstance(other, Jammer)
+            seen['typed'] += 1
+
+        def untyped(uav, other):
+            seen['untyped'] += 1
+
+        env = Environment()
+        uav = env.add(Uav(track=[[0, 0], [100, 0]], speed=1.0))
+        env.add_many(Entity() for _ in range(50))
+        env.add_many([Jammer(), Jammer(kind='gps')])
+        uav.rules.append(typed)
+        self.assertEqual(uav.access_types(), (Jammer,))
+        env.run(stop=0.5)
+        self.assertEqual(seen, {'typed': 2 * env.ticks, 'untyped': 0})
+
+        uav.rules.append(untyped)
+        self.assertIsNone(rule_types(uav.rules))
+        env.run(stop=0.5)
+        self.assertEqual(seen['untyped'], 52 * env.ticks)
+
+        others = [Entity(), Jammer()]
+        self.assertEqual([len(objs) for _, objs in dispatch([typed, untyped], others)], [1, 2])
@@ -23,6 +23,17 @@ class TestVec(unittest.TestCase):
         self.assertTrue((unit(v2) == v2 / (2 ** 0.5)).all())
         self.assertTrue((unit(v2 - v1) == - unit(v1 - v2)).all())
 
+    def test_unit_out(self):
+        v = vec([3, 4])
+        out = zeros_like(v)
+        ret = unit(v, out=out)
+        self.assertTrue(ret is out)
+        np.testing.assert_almost_equal(out, [0.6, 0.8])
+        unit(v, out=v)
+        np.testing.assert_almost_equal(v, [0.6, 0.8])
+        unit(vec([0, 0]), out=v)
+        np.testing.assert_almost_equal(v, [0, 0])
+
     def test_angle(self):
         v1 = vec([0, 0])
         v2 = vec([1, 1])